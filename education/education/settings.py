@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'study.middleware.MetricsMiddleware',
+    'study.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,17 +80,56 @@ WSGI_APPLICATION = 'education.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# study.db.pooled is the PostgreSQL backend with a per-process connection pool.
+# Django still closes the connection at the end of each request (CONN_MAX_AGE
+# is 0), which hands it back to the pool instead of disconnecting. POOL keys:
+# MIN_SIZE/MAX_SIZE connections, TIMEOUT seconds to wait for a free one,
+# CHECK_INTERVAL seconds a connection may sit idle before it is pinged on
+# checkout, MAX_IDLE seconds before idle connections above MIN_SIZE are closed
+# and MAX_LIFETIME seconds before a connection is replaced. Size MAX_SIZE to
+# the worker threads (WSGI) or concurrent requests (ASGI) of one process.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'study.db.pooled',
         'NAME': 'education',
         'USER': 'postgres',
         'PASSWORD': 'postgres',
         'HOST': 'localhost',
         'PORT': '',
+        'POOL': {
+            'MIN_SIZE': 2,
+            'MAX_SIZE': 20,
+            'TIMEOUT': 10,
+            'CHECK_INTERVAL': 5,
+            'MAX_IDLE': 300,
+            'MAX_LIFETIME': 3600,
+        },
     }
 }
 
+# Reads of study models in GET/HEAD/OPTIONS requests and report generation go to
+# one of DATABASE_REPLICAS; everything else uses the primary ('default').
+# Replicas whose lag (checked at most every REPLICA_LAG_CHECK_INTERVAL seconds)
+# exceeds REPLICA_MAX_LAG seconds, or that can't be reached, are skipped, and
+# with none left reads fall back to the primary. After a write the client gets
+# a db_pin cookie and X-DB-Pin header and is read from the primary for
+# REPLICA_PIN_SECONDS. To try it locally point DATABASE_REPLICA_NAME (and
+# optionally DATABASE_REPLICA_HOST) at a second database.
+DATABASE_ROUTERS = ['study.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5
+REPLICA_MAX_LAG = 2
+REPLICA_LAG_CHECK_INTERVAL = 1
+
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        'HOST': os.environ.get('DATABASE_REPLICA_HOST', DATABASES['default']['HOST']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -113,10 +154,55 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-    ]
+        'study.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'study.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'study.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'study.filters.FieldFilterBackend',
+        'study.filters.NameSearchBackend',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'study.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
 }
 
+# Upper bound for the ?page_size= query parameter.
+API_MAX_PAGE_SIZE = 1000
+
+# Cached API responses (CachedResponseMixin) are stored in this CACHES alias.
+# Entries are keyed by the data versions of the models they depend on, so
+# writes invalidate them and any backend works: local memory, file based or
+# Redis. The timeout only bounds how long unused entries are kept.
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 300
+
+# Serve list and retrieve of the catalog and roster endpoints with async views
+# (study.asyncviews.AsyncReadMixin) when running under ASGI with
+# API_ASYNC_VIEWS=1. Other actions fall back to the sync viewset, and under WSGI
+# the regular viewsets are routed instead.
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS') == '1'
+
+# Authenticated users are cached per process for AUTH_CACHE_TTL seconds, at most
+# AUTH_CACHE_SIZE entries. Set AUTH_CACHE_ALIAS to a CACHES alias to share entries
+# between processes. Signals only clear the cache of the process that made the
+# change (and the shared cache), so other processes may serve a stale user until
+# the TTL runs out.
+#
+# Replace BasicAuthentication with study.authentication.CachedBasicAuthentication
+# to skip the password hasher for credentials verified within the TTL. Entries
+# are keyed by an HMAC of username and password and hold a digest of the
+# password hash, so a password change invalidates them immediately.
+AUTH_CACHE_TTL = 60
+AUTH_CACHE_SIZE = 10000
+AUTH_CACHE_ALIAS = None
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
@@ -144,3 +230,19 @@ AUTH_USER_MODEL = 'study.User'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+
+REPORT_CHUNK_SIZE = 2000
+
+# Prometheus metrics are served at /metrics when prometheus_client is installed.
+# With several worker processes set the PROMETHEUS_MULTIPROC_DIR environment
+# variable to a shared empty directory so that values are aggregated, and call
+# prometheus_client.multiprocess.mark_process_dead(pid) when a worker exits.
+# Only staff users and clients from METRICS_ALLOWED_NETWORKS (addresses or CIDR
+# networks, matched against REMOTE_ADDR) may read them.
+METRICS_ALLOWED_NETWORKS = []
+
+# Report downloads are handed over to the front web server: 'nginx' uses
+# X-Accel-Redirect to SENDFILE_URL + file name, 'apache' uses X-Sendfile.
+# None serves the file from Django (development).
+SENDFILE_BACKEND = None
+SENDFILE_URL = '/protected/'
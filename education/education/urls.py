@@ -13,12 +13,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from study.api.v1.courses import CourseViewSet, SubjectViewSet, StudyGroupViewSet, ReportViewSet
 from study.api.v1.users import UserViewSet, TutorViewSet, StudentViewSet
+from study.asyncviews import async_urlpatterns
+from study.views import metrics
 
 
 router = SimpleRouter()
@@ -34,6 +37,10 @@ router.register('api/v1/reports', ReportViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
 ]
 
-urlpatterns += router.urls
+if settings.API_ASYNC_VIEWS:
+    urlpatterns += async_urlpatterns(router.urls)
+else:
+    urlpatterns += router.urls
@@ -1,24 +1,38 @@
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.serializers import ValidationError
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 
-from study.models import Course, Subject, StudyGroup, Tutor, Report
+from study.models import User, Course, Subject, StudyGroup, Tutor, Report, ReportType, ReportFormat, Status
 from study.selializers import CourseSerializer, SubjectSerializer, StudyGroupSerializer, ReportSerializer
-from study.permissions import IsAdmin, IsTutor
+from study.permissions import IsAdmin, IsAdminOnly, IsTutor
+from study.downloads import file_response
+from study.asyncviews import AsyncReadMixin
+from study.caching import CachedResponseMixin, ConditionalGetMixin
+from study.compiled import CompiledListMixin
+from study.fieldsets import ExpandableViewMixin
+from study.reports import report_watermark, find_reusable_report
 
 
-class SubjectViewSet(ModelViewSet):
-    queryset = Subject.objects.all().order_by('name')
+class SubjectViewSet(AsyncReadMixin, ConditionalGetMixin, CachedResponseMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = Subject.objects.all().order_by('name', 'id')
     serializer_class = SubjectSerializer
     permission_classes = [IsAdmin]
+    keyset_ordering = ('name', 'id')
+    cache_models = (Subject, )
 
 
-class CourseViewSet(ModelViewSet):
-    queryset = Course.objects.all().select_related('tutor').prefetch_related('subjects').order_by('name')
+class CourseViewSet(AsyncReadMixin, ConditionalGetMixin, CachedResponseMixin, CompiledListMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = Course.objects.all().select_related('tutor__user').prefetch_related('subjects').order_by('name', 'id')
     serializer_class = CourseSerializer
     permission_classes = [IsAdmin]
+    keyset_ordering = ('name', 'id')
+    cache_models = (Course, Subject, Tutor, User)
+    filter_fields = {'tutor': 'tutor__user', 'subject': 'subjects'}
+    search_fields = ('name', )
 
     @transaction.atomic
     def create(self, request, *args, **kwargs):
@@ -27,30 +41,38 @@ class CourseViewSet(ModelViewSet):
         except Tutor.DoesNotExist:
             raise ValidationError({'message': 'Tutot does not exist'})
 
+        try:
+            subject_ids = list(dict.fromkeys(int(subject_data['id']) for subject_data in request.data['subjects']))
+        except (TypeError, ValueError):
+            raise ValidationError({'message': 'Subject id must be an integer'})
+
+        subjects = Subject.objects.in_bulk(subject_ids)
+        missing = [subject_id for subject_id in subject_ids if subject_id not in subjects]
+        if missing:
+            raise ValidationError({'message': 'Subject does not exist', 'subjects': missing})
+
         course = Course.objects.create(
             name=request.data['name'],
             tutor=tutor
         )
+        course.subjects.add(*subjects.values())
 
-        for subject_data in request.data['subjects']:
-            try:
-                subject = Subject.objects.get(pk=subject_data['id'])
-            except Subject.DoesNotExist:
-                raise ValidationError({'message': 'Subject does not exist'})
-            course.subjects.add(subject)
-
-        headers = self.get_success_headers(request.data)
-        return Response(request.data, status=status.HTTP_201_CREATED, headers=headers)
+        serializer = self.get_serializer(self.get_queryset().get(pk=course.pk))
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return super().update(request, *args, **kwargs)
         
 
-class StudyGroupViewSet(ModelViewSet):
-    queryset = StudyGroup.objects.all()
+class StudyGroupViewSet(AsyncReadMixin, ConditionalGetMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = StudyGroup.objects.all().select_related('course__tutor__user').prefetch_related('course__subjects').order_by('id')
     serializer_class = StudyGroupSerializer
     permission_classes = [IsTutor]
+    cache_models = (StudyGroup, Course, Subject, Tutor, User)
+    filter_fields = {'course': 'course'}
+    search_fields = ('name', )
 
     @transaction.atomic
     def create(self, request, *args, **kwargs):
@@ -72,7 +94,26 @@ class StudyGroupViewSet(ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
-class ReportViewSet(ModelViewSet):
-    queryset = Report.objects.all()
+class ReportViewSet(ConditionalGetMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = Report.objects.all().order_by('created_at', 'id')
     serializer_class = ReportSerializer
     permission_classes = [IsAdmin]
+    keyset_ordering = ('created_at', 'id')
+
+    def perform_create(self, serializer):
+        report_type = serializer.validated_data.get('type', ReportType.COURSE)
+        report_format = serializer.validated_data.get('format', ReportFormat.CSV)
+        watermark = report_watermark(report_type)
+
+        previous = find_reusable_report(report_type, report_format, watermark)
+        if previous is None:
+            serializer.save()
+        else:
+            serializer.save(status=Status.COMPLETED, file=previous.file, watermark=watermark)
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminOnly])
+    def download(self, request, *args, **kwargs):
+        report = self.get_object()
+        if report.status != Status.COMPLETED or not report.file:
+            raise NotFound('Report file is not ready')
+        return file_response(request, report.file)
@@ -1,19 +1,36 @@
+import io
+
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.serializers import ValidationError
+from rest_framework.response import Response
+from rest_framework import status
 
-from study.models import User, Tutor, Student
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course
 from study.selializers import UserSerializer, TutorReadSerializer, TutorWriteSerializer, StudentReadSerializer, StudentWriteSerializer
-from study.permissions import IsOwnerOrStaff, IsAdmin, IsTutor
+from study.permissions import IsOwnerOrStaff, IsAdmin, IsAdminOnly, IsTutor
+from study.bulk import bulk_save_students
+from study.asyncviews import AsyncReadMixin
+from study.caching import ConditionalGetMixin
+from study.compiled import CompiledListMixin
+from study.fieldsets import ExpandableViewMixin
+from study.roster import import_roster, RosterError
 
 
-class UserViewSet(ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(ConditionalGetMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
     permission_classes = [IsOwnerOrStaff]
+    filter_fields = {'role': 'role'}
+    search_fields = ('first_name', 'last_name')
 
 
-class TutorViewSet(ModelViewSet):
-    queryset = Tutor.objects.all()
+class TutorViewSet(ConditionalGetMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = Tutor.objects.all().select_related('user').order_by('id')
     permission_classes = [IsAdmin]
+    cache_models = (Tutor, User)
+    search_fields = ('user__first_name', 'user__last_name')
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -22,12 +39,51 @@ class TutorViewSet(ModelViewSet):
         return TutorReadSerializer
 
 
-class StudentViewSet(ModelViewSet):
-    queryset = Student.objects.all()
+class StudentViewSet(AsyncReadMixin, ConditionalGetMixin, CompiledListMixin, ExpandableViewMixin, ModelViewSet):
+    queryset = Student.objects.all().select_related('user', 'study_group__course__tutor__user').prefetch_related('study_group__course__subjects').order_by('id')
     permission_classes = [IsTutor]
+    cache_models = (Student, User, StudyGroup, Course, Subject, Tutor)
+    filter_fields = {
+        'study_group': 'study_group',
+        'course': 'study_group__course',
+        'gender': 'gender',
+        'tutor': 'study_group__course__tutor__user',
+    }
+    search_fields = ('user__first_name', 'user__last_name')
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
             return StudentWriteSerializer
 
         return StudentReadSerializer
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        created, updated, errors = bulk_save_students(request.data)
+        if errors and not created and not updated:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+
+        return Response({
+            'created': [student.id for student in created],
+            'updated': [student.id for student in updated],
+            'errors': errors,
+        }, status=response_status)
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAdminOnly], parser_classes=[MultiPartParser])
+    def upload_roster(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ['No file was submitted.']})
+
+        try:
+            result = import_roster(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        except (RosterError, UnicodeDecodeError) as e:
+            raise ValidationError({'file': [str(e)]})
+
+        return Response(result)
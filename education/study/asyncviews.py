@@ -0,0 +1,142 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.urls import URLPattern
+from rest_framework.response import Response
+
+
+async def afetch(queryset):
+    # A page is fetched in one go; aiterator() would open a server-side cursor.
+    if queryset._prefetch_related_lookups or queryset.query.is_sliced:
+        return [obj async for obj in queryset]
+    return [obj async for obj in queryset.aiterator()]
+
+
+class AsyncReadMixin:
+    async_actions = ('list', 'retrieve')
+
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        sync_view = cls.as_view(actions, **initkwargs)
+
+        async def view(request, *args, **kwargs):
+            action = actions.get(request.method.lower())
+            if action not in cls.async_actions:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            return await self.adispatch(request, action, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, action, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            validators, response = await sync_to_async(self.prepare_read)(request, *args, **kwargs)
+            if response is None:
+                response = await getattr(self, f'a{action}')(request, *args, **kwargs)
+                if hasattr(self, 'cache_response'):
+                    response = await sync_to_async(self.cache_response)(request, response)
+                if validators is not None:
+                    response = self.set_validators(response, *validators)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def prepare_read(self, request, *args, **kwargs):
+        # Everything before and after the query goes through the same helpers as
+        # the sync viewset, in one hop to the request's thread each: the checks
+        # in initial(), whatever the filter backends look up, and the
+        # conditional GET and response cache of ConditionalGetMixin and
+        # CachedResponseMixin.
+        self.initial(request, *args, **kwargs)
+        for backend in self.filter_backends:
+            if hasattr(backend, 'prepare'):
+                backend().prepare(request, self)
+
+        validators = None
+        if hasattr(self, 'get_list_validators'):
+            if self.action == 'list':
+                validators = self.get_list_validators(request)
+            else:
+                validators = self.get_detail_validators(request)
+        if validators is not None:
+            response = self.not_modified_response(request, *validators)
+            if response is not None:
+                return validators, response
+        if hasattr(self, 'get_cached_response'):
+            response = self.get_cached_response(request)
+            if response is not None:
+                if validators is not None:
+                    response = self.set_validators(response, *validators)
+                return validators, response
+        return validators, None
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        compiled = self.get_compiled_serializer() if hasattr(self, 'get_compiled_serializer') else None
+        if compiled is not None:
+            queryset = compiled.get_queryset(queryset)
+
+        page = await self.apaginate_queryset(queryset)
+        rows = page if page is not None else await afetch(queryset)
+        if compiled is not None:
+            data = await compiled.aserialize(rows, request)
+        else:
+            data = await self.aserialize(rows, many=True)
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
+
+    async def aserialize(self, instance, many=False):
+        # Serializers may still touch a relation the queryset doesn't load, and
+        # that query has to run outside the event loop.
+        return await sync_to_async(lambda: self.get_serializer(instance, many=many).data)()
+
+    async def aget_object(self):
+        # GenericAPIView.get_object() with aget().
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, 'apaginate_queryset'):
+            return await paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(paginator.paginate_queryset)(queryset, self.request, view=self)
+
+
+def async_urlpatterns(urlpatterns):
+    patterns = []
+    for pattern in urlpatterns:
+        cls = getattr(pattern.callback, 'cls', None) if isinstance(pattern, URLPattern) else None
+        if cls is not None and issubclass(cls, AsyncReadMixin):
+            view = cls.as_async_view(pattern.callback.actions, **pattern.callback.initkwargs)
+            pattern = URLPattern(pattern.pattern, view, pattern.default_args, pattern.name)
+        patterns.append(pattern)
+    return patterns
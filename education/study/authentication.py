@@ -0,0 +1,171 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+
+from .metrics import make_metric
+
+
+AUTH_CACHE_REQUESTS = make_metric(
+    'Counter', 'api_auth_cache_requests', 'Authentication cache lookups by result', ('backend', 'result'),
+)
+
+
+class LocalCache:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, max_size):
+        with self.lock:
+            self.entries[key] = (value, monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Only what authentication and the permission classes read is cached; the
+# other fields are loaded from the database if something asks for them. The
+# password hash in particular must not end up in a shared cache.
+CACHED_USER_FIELDS = ('id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+def dump_user(user):
+    return {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+
+
+def load_user(values):
+    User = get_user_model()
+    return User.from_db(router.db_for_read(User), list(values), list(values.values()))
+
+
+class AuthCache:
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.local = LocalCache()
+
+    def get_ttl(self):
+        return getattr(settings, 'AUTH_CACHE_TTL', 60)
+
+    def get_max_size(self):
+        return getattr(settings, 'AUTH_CACHE_SIZE', 10000)
+
+    def get_shared(self):
+        alias = getattr(settings, 'AUTH_CACHE_ALIAS', None)
+        return caches[alias] if alias else None
+
+    def digest(self, key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def make_key(self, key):
+        return f'{self.prefix}:{self.digest(key)}'
+
+    def get(self, key):
+        key = self.make_key(key)
+        value = self.local.get(key)
+        if value is None:
+            shared = self.get_shared()
+            if shared is None:
+                return None
+            value = shared.get(key)
+            if value is None:
+                return None
+            self.local.set(key, value, self.get_ttl(), self.get_max_size())
+        return value
+
+    def set(self, key, value):
+        key = self.make_key(key)
+        self.local.set(key, value, self.get_ttl(), self.get_max_size())
+        shared = self.get_shared()
+        if shared is not None:
+            shared.set(key, value, self.get_ttl())
+
+    def delete(self, *keys):
+        keys = [self.make_key(key) for key in keys]
+        self.local.delete(*keys)
+        shared = self.get_shared()
+        if shared is not None:
+            shared.delete_many(keys)
+
+    def clear(self):
+        self.local.clear()
+
+
+class CredentialCache(AuthCache):
+    def digest(self, key):
+        return salted_hmac(self.prefix, key, algorithm='sha256').hexdigest()
+
+
+token_cache = AuthCache('auth-token')
+credential_cache = CredentialCache('auth-basic')
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        values = self.cache.get(key)
+        if values is not None:
+            AUTH_CACHE_REQUESTS.labels('token', 'hit').inc()
+            user = load_user(values)
+            return user, self.get_model()(key=key, user=user)
+
+        AUTH_CACHE_REQUESTS.labels('token', 'miss').inc()
+        user, token = super().authenticate_credentials(key)
+        self.cache.set(key, dump_user(user))
+        return user, token
+
+
+def password_digest(user):
+    return hashlib.sha256(user.password.encode()).hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    cache = credential_cache
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = f'{userid}\0{password}'
+        digest = self.cache.get(key)
+        if digest is not None:
+            User = get_user_model()
+            try:
+                user = User._default_manager.get_by_natural_key(userid)
+            except User.DoesNotExist:
+                user = None
+            if user is not None and user.is_active and constant_time_compare(digest, password_digest(user)):
+                AUTH_CACHE_REQUESTS.labels('basic', 'hit').inc()
+                return user, None
+            self.cache.delete(key)
+
+        AUTH_CACHE_REQUESTS.labels('basic', 'miss').inc()
+        user, auth = super().authenticate_credentials(userid, password, request)
+        self.cache.set(key, password_digest(user))
+        return user, auth
@@ -0,0 +1,145 @@
+import asyncio
+import io
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from time import perf_counter
+from types import ModuleType
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+from study.asyncviews import async_urlpatterns
+
+
+def summarize(latencies, elapsed, statuses):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for code in statuses if code != 200),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(len(latencies) - 1, round(0.99 * (len(latencies) - 1)))] * 1000, 3),
+    }
+
+
+def split_url(url):
+    path, _, query = url.partition('?')
+    return path, query
+
+
+def run_wsgi(url, concurrency, requests, threads):
+    handler = WSGIHandler()
+    path, query = split_url(url)
+    latencies, statuses = [], []
+
+    def handle(_):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'HTTP_HOST': 'testserver',
+            'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+            'wsgi.url_scheme': 'http', 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+            'wsgi.run_once': False, 'wsgi.version': (1, 0),
+        }
+        status = []
+        body = handler(environ, lambda code, headers: status.append(int(code.split()[0])))
+        try:
+            b''.join(body)
+        finally:
+            body.close()
+        return status[0]
+
+    # Clients keep `concurrency` requests in flight against a server with a
+    # fixed number of worker threads, like a threaded WSGI server would.
+    with ThreadPoolExecutor(threads) as server, ThreadPoolExecutor(concurrency) as clients:
+        def request(i):
+            start = perf_counter()
+            statuses.append(server.submit(handle, i).result())
+            latencies.append(perf_counter() - start)
+
+        start = perf_counter()
+        list(clients.map(request, range(requests)))
+    return summarize(latencies, perf_counter() - start, statuses)
+
+
+def run_asgi(url, concurrency, requests):
+    handler = ASGIHandler()
+    path, query = split_url(url)
+    latencies, statuses = [], []
+
+    async def request(semaphore):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'query_string': query.encode(),
+            'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+        }
+        status = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        async with semaphore:
+            start = perf_counter()
+            await handler(scope, receive, send)
+            latencies.append(perf_counter() - start)
+        statuses.append(status[0])
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(request(semaphore) for _ in range(requests)))
+
+    start = perf_counter()
+    asyncio.run(run())
+    return summarize(latencies, perf_counter() - start, statuses)
+
+
+@contextmanager
+def database_latency(seconds):
+    # Adds a fixed delay to every query, to model a database across the network.
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    if not seconds:
+        yield
+        return
+
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+
+
+def async_urlconf():
+    urlconf = ModuleType('async_urls')
+    urlconf.urlpatterns = async_urlpatterns(import_module(settings.ROOT_URLCONF).urlpatterns)
+    return urlconf
+
+
+def run_concurrency(url, levels, requests, threads, db_latency=0):
+    results = {'wsgi': {}, 'asgi': {}}
+    with database_latency(db_latency):
+        for concurrency in levels:
+            results['wsgi'][str(concurrency)] = run_wsgi(url, concurrency, requests, threads)
+        with override_settings(ROOT_URLCONF=async_urlconf()):
+            for concurrency in levels:
+                results['asgi'][str(concurrency)] = run_asgi(url, concurrency, requests)
+    return results
+
+
+def max_concurrency(results, p99_ms):
+    levels = [int(level) for level, result in results.items() if result['p99_ms'] <= p99_ms and not result['errors']]
+    return max(levels, default=0)
@@ -0,0 +1,68 @@
+from itertools import islice
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, Report, ReportType, Status
+from study.stats import rebuild_stats
+from study.versions import bump_versions
+
+
+STUDENTS_PER_GROUP = 25
+GROUPS_PER_COURSE = 40
+SUBJECTS = 200
+SUBJECTS_PER_COURSE = 10
+REPORTS = 100
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def clear():
+    call_command('flush', interactive=False, verbosity=0)
+
+
+def seed(students, batch_size=5000):
+    groups = max(1, students // STUDENTS_PER_GROUP)
+    courses = max(1, groups // GROUPS_PER_COURSE)
+
+    with transaction.atomic():
+        tutor_users = User.objects.bulk_create(
+            User(username=f'tutor{i}', first_name=f'Tutor{i}', last_name='Benchmark', role=Role.TUTOR) for i in range(courses)
+        )
+        tutors = Tutor.objects.bulk_create(Tutor(user=user) for user in tutor_users)
+        subjects = Subject.objects.bulk_create(Subject(name=f'Subject {i:04}') for i in range(SUBJECTS))
+        course_objs = Course.objects.bulk_create(
+            Course(name=f'Course {i:05}', tutor=tutors[i]) for i in range(courses)
+        )
+        Course.subjects.through.objects.bulk_create(
+            Course.subjects.through(course=course, subject=subjects[(i + j) % SUBJECTS])
+            for i, course in enumerate(course_objs) for j in range(SUBJECTS_PER_COURSE)
+        )
+        group_ids = []
+        for batch in batched((StudyGroup(name=f'g-{i:06}', course=course_objs[i % courses]) for i in range(groups)), batch_size):
+            group_ids.extend(group.id for group in StudyGroup.objects.bulk_create(batch))
+        Report.objects.bulk_create(
+            Report(type=ReportType.COURSE, status=Status.COMPLETED) for _ in range(REPORTS)
+        )
+
+    for start in range(0, students, batch_size):
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                User(username=f'student{i}', first_name=f'Student{i}', last_name=f'Benchmark{i % 97}', role=Role.STUDENT)
+                for i in range(start, min(start + batch_size, students))
+            )
+            Student.objects.bulk_create(
+                Student(user=user, gender=Gender.FEMALE if i % 2 else Gender.MALE, study_group_id=group_ids[(start + i) % groups])
+                for i, user in enumerate(users)
+            )
+
+    rebuild_stats()
+    bump_versions(User, Tutor, Student, StudyGroup, Subject, Course, Report)
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
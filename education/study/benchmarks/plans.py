@@ -0,0 +1,94 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from study.models import Report, ReportFormat, ReportType, Status
+from study.reports import find_reusable_report
+
+
+PAGE_SIZE = 100
+
+
+def get_endpoints():
+    router = import_module(settings.ROOT_URLCONF).router
+    for prefix, viewset, basename in router.registry:
+        yield basename, viewset
+
+
+def capture_request(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return [query['sql'] for query in context.captured_queries]
+
+
+def capture_call(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return [query['sql'] for query in context.captured_queries]
+
+
+def get_cases():
+    client = APIClient()
+    cases = {}
+
+    for basename, viewset in get_endpoints():
+        cases[f'list:{basename}'] = lambda url=reverse(f'{basename}-list') + f'?page_size={PAGE_SIZE}': capture_request(client, url)
+
+        pk = viewset.queryset.model.objects.order_by('-pk').values_list('pk', flat=True).first()
+        if pk is not None:
+            cases[f'detail:{basename}'] = lambda url=reverse(f'{basename}-detail', args=(pk, )): capture_request(client, url)
+
+    # Not an endpoint, but polled by every report worker.
+    cases['worker:claim'] = lambda: capture_call(
+        lambda: Report.objects.filter(status=Status.CREATED).order_by('created_at', 'id').first()
+    )
+    cases['worker:reuse'] = lambda: capture_call(
+        lambda: find_reusable_report(ReportType.COURSE, ReportFormat.CSV, '')
+    )
+    return cases
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+        return cursor.fetchone()[0][0]['Plan']
+
+
+def iter_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from iter_nodes(child)
+
+
+def scanned_rows(node):
+    return (node.get('Actual Rows', 0) + node.get('Rows Removed by Filter', 0)) * node.get('Actual Loops', 1)
+
+
+def find_seq_scans(plan, max_rows):
+    return [
+        (node['Relation Name'], scanned_rows(node)) for node in iter_nodes(plan)
+        if node['Node Type'] == 'Seq Scan' and scanned_rows(node) > max_rows
+    ]
+
+
+def check_query_plans(max_seq_rows, cases=None, log=print):
+    caches[settings.API_CACHE_ALIAS].clear()
+    violations = []
+
+    for name, capture in get_cases().items():
+        if cases and not any(name.startswith(case) for case in cases):
+            continue
+
+        queries = [sql for sql in capture() if sql.lstrip().upper().startswith('SELECT')]
+        for sql in queries:
+            plan = explain(sql)
+            scans = find_seq_scans(plan, max_seq_rows)
+            violations.extend((name, relation, rows, sql) for relation, rows in scans)
+            log(f'{name:<24} {plan["Actual Total Time"]:>10.3f} ms  {plan["Node Type"]:<20} {sql[:80]}')
+    return violations
@@ -0,0 +1,230 @@
+import json
+import platform
+import tracemalloc
+from time import perf_counter
+
+import django
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from study.api.v1.courses import CourseViewSet, SubjectViewSet, StudyGroupViewSet, ReportViewSet
+from study.api.v1.users import UserViewSet, TutorViewSet, StudentViewSet
+from study.benchmarks.concurrency import run_concurrency, max_concurrency
+from study.compiled import CompiledSerializer
+from study.middleware import QueryStats
+from study.renderers import FastJSONRenderer
+from study.selializers import UserSerializer, TutorReadSerializer, SubjectSerializer, CourseSerializer, \
+                            StudyGroupSerializer, StudentReadSerializer, ReportSerializer
+
+
+PAGE_SIZE = 100
+
+ENDPOINTS = [
+    ('user', UserViewSet, UserSerializer),
+    ('tutor', TutorViewSet, TutorReadSerializer),
+    ('student', StudentViewSet, StudentReadSerializer),
+    ('course', CourseViewSet, CourseSerializer),
+    ('subject', SubjectViewSet, SubjectSerializer),
+    ('studygroup', StudyGroupViewSet, StudyGroupSerializer),
+    ('report', ReportViewSet, ReportSerializer),
+]
+
+COMPILED_ENDPOINTS = ('student', 'course')
+
+CONCURRENCY_ENDPOINTS = ('student', 'course', 'subject', 'studygroup')
+
+RENDERERS = [
+    ('json', JSONRenderer),
+    ('fast', FastJSONRenderer),
+]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def measure(func, iterations):
+    func()
+
+    timings = []
+    queries = QueryStats()
+    with connection.execute_wrapper(queries):
+        for _ in range(iterations):
+            start = perf_counter()
+            func()
+            timings.append(perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'queries': queries.count / iterations,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+# Both serializer cases load the page themselves, select_related() and
+# prefetches included, so that they compare the same work.
+def serializer_case(viewset, serializer_class):
+    return lambda: serializer_class(list(viewset.queryset[:PAGE_SIZE]), many=True).data
+
+
+def compiled_case(viewset, serializer_class):
+    compiled = CompiledSerializer(serializer_class(), viewset.queryset.model)
+    return lambda: compiled.serialize(compiled.get_queryset(viewset.queryset)[:PAGE_SIZE])
+
+
+def compiled_speedups(cases):
+    speedups = {}
+    for basename, viewset, serializer_class in ENDPOINTS:
+        result = cases.get(f'compiled:{serializer_class.__name__}')
+        baseline = cases.get(f'serialize:{serializer_class.__name__}')
+        if result is None or baseline is None or not result['p50_ms']:
+            continue
+        speedups[serializer_class.__name__] = {
+            'speedup': round(baseline['p50_ms'] / result['p50_ms'], 2),
+            'rows': viewset.queryset[:PAGE_SIZE].count(),
+        }
+    return speedups
+
+
+def render_case(viewset, serializer_class, renderer_class):
+    data = serializer_class(list(viewset.queryset[:PAGE_SIZE]), many=True).data
+    renderer = renderer_class()
+    return lambda: renderer.render(data)
+
+
+def endpoint_case(client, url):
+    def run():
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+    return run
+
+
+def get_cases():
+    client = APIClient()
+    cases = {}
+
+    for basename, viewset, serializer_class in ENDPOINTS:
+        cases[f'serialize:{serializer_class.__name__}'] = serializer_case(viewset, serializer_class)
+        if basename in COMPILED_ENDPOINTS:
+            cases[f'compiled:{serializer_class.__name__}'] = compiled_case(viewset, serializer_class)
+            for name, renderer_class in RENDERERS:
+                cases[f'render:{name}:{basename}'] = render_case(viewset, serializer_class, renderer_class)
+        cases[f'list:{basename}'] = endpoint_case(client, reverse(f'{basename}-list') + f'?page_size={PAGE_SIZE}')
+
+        pk = viewset.queryset.model.objects.order_by('-id').values_list('id', flat=True).first()
+        if pk is not None:
+            cases[f'detail:{basename}'] = endpoint_case(client, reverse(f'{basename}-detail', args=(pk,)))
+
+    return cases
+
+
+def run_concurrency_cases(levels, requests, threads, p99_budget, db_latency=0, cases=None, log=print):
+    results = {}
+    for basename in CONCURRENCY_ENDPOINTS:
+        name = f'concurrency:{basename}'
+        if cases and not any(name.startswith(case) for case in cases):
+            continue
+
+        url = reverse(f'{basename}-list') + f'?page_size={PAGE_SIZE}'
+        results[name] = run_concurrency(url, levels, requests, threads, db_latency)
+        for mode, levels_results in results[name].items():
+            for level, result in levels_results.items():
+                log(f'{"":>9} {name:<40} {mode} x{level:<5} {result}')
+        results[name]['max_concurrency'] = {
+            mode: max_concurrency(results[name][mode], p99_budget) for mode in ('wsgi', 'asgi')
+        }
+        log(f'{"":>9} {name:<40} within {p99_budget} ms p99: {results[name]["max_concurrency"]}')
+    return results
+
+
+def run_benchmarks(sizes, iterations, seed, clear, cases=None, log=print,
+                   concurrency=None, requests=200, threads=4, p99_budget=100, db_latency=0):
+    results = {}
+    speedups = {}
+    concurrency_results = {}
+
+    for size in sizes:
+        log(f'Seeding {size} students')
+        clear()
+        seed(size)
+
+        results[str(size)] = {}
+        for name, func in get_cases().items():
+            if cases and not any(name.startswith(case) for case in cases):
+                continue
+            results[str(size)][name] = measure(func, iterations)
+            log(f'{size:>9} {name:<40} {results[str(size)][name]}')
+
+        speedups[str(size)] = compiled_speedups(results[str(size)])
+        for name, speedup in speedups[str(size)].items():
+            log(f'{size:>9} {"speedup:" + name:<40} compiled is {speedup["speedup"]}x faster on {speedup["rows"]} rows')
+
+        if concurrency:
+            concurrency_results[str(size)] = run_concurrency_cases(
+                concurrency, requests, threads, p99_budget, db_latency, cases, log,
+            )
+
+    output = {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+        },
+        'results': results,
+        'speedups': speedups,
+    }
+    if concurrency_results:
+        output['concurrency'] = concurrency_results
+    return output
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+
+    for size, cases in results['results'].items():
+        for name, current in cases.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append((size, name, 'queries', previous['queries'], current['queries']))
+            for metric in ('p50_ms', 'p99_ms', 'peak_memory_kb'):
+                if current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append((size, name, metric, previous[metric], current[metric]))
+
+    return regressions
+
+
+def slow_compiled(results, min_speedup):
+    # Only full pages count: on a handful of rows the query round trips take
+    # most of the time in both cases.
+    return [
+        (size, name, speedup['speedup'])
+        for size, speedups in results.get('speedups', {}).items()
+        for name, speedup in speedups.items()
+        if speedup['rows'] == PAGE_SIZE and speedup['speedup'] < min_speedup
+    ]
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
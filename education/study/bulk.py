@@ -0,0 +1,187 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from .models import User, Student, StudyGroup, Gender
+from .selializers import StudentWriteSerializer
+from .stats import update_student_stats
+from .versions import bump_versions
+
+
+BATCH_SIZE = 1000
+
+
+def parse_id(value):
+    if isinstance(value, bool):
+        raise ValueError
+    return int(value)
+
+
+def collect_ids(items, field):
+    ids = set()
+    for item in items:
+        if isinstance(item, dict) and item.get(field) is not None:
+            try:
+                ids.add(parse_id(item[field]))
+            except (TypeError, ValueError):
+                pass
+    return ids
+
+
+def field_errors(field, key, **kwargs):
+    try:
+        field.fail(key, **kwargs)
+    except ValidationError as e:
+        return e.detail
+
+
+def unique_errors(field):
+    validator = next(validator for validator in field.validators if isinstance(validator, UniqueValidator))
+    return ValidationError(validator.message, code='unique').detail
+
+
+def related_pk(field, value, objects):
+    # PrimaryKeyRelatedField.to_internal_value() against objects loaded in bulk.
+    try:
+        pk = parse_id(value)
+    except (TypeError, ValueError):
+        return None, field_errors(field, 'incorrect_type', data_type=type(value).__name__)
+    if pk not in objects:
+        return None, field_errors(field, 'does_not_exist', pk_value=value)
+    return pk, None
+
+
+def validate_items(items, serializer):
+    # Items are checked with the messages of StudentWriteSerializer, but the
+    # related objects are loaded once for the whole request.
+    fields = serializer.fields
+    students = Student.objects.in_bulk(collect_ids(items, 'id'))
+    user_ids = collect_ids(items, 'user')
+    users = User.objects.only('id').in_bulk(user_ids)
+    groups = StudyGroup.objects.only('id').in_bulk(collect_ids(items, 'study_group'))
+    student_by_user = dict(Student.objects.filter(user_id__in=user_ids).values_list('user_id', 'id'))
+
+    valid, errors = [], []
+    seen_users, seen_students = set(), set()
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            message = serializer.error_messages['invalid'].format(datatype=type(item).__name__)
+            errors.append({'index': index, 'errors': {api_settings.NON_FIELD_ERRORS_KEY: [message]}})
+            continue
+
+        item_errors = {}
+        student = None
+
+        if item.get('id') is not None:
+            try:
+                student = students.get(parse_id(item['id']))
+            except (TypeError, ValueError):
+                pass
+            if student is None:
+                item_errors['id'] = [f'Student "{item["id"]}" does not exist.']
+            elif student.id in seen_students:
+                item_errors['id'] = ['Duplicate student in request.']
+
+        user_id = None
+        if 'user' not in item and student is not None:
+            user_id = student.user_id
+        elif item.get('user') is None:
+            item_errors['user'] = field_errors(fields['user'], 'null' if 'user' in item else 'required')
+        else:
+            user_id, item_errors['user'] = related_pk(fields['user'], item['user'], users)
+        if user_id is not None:
+            owner = student_by_user.get(user_id)
+            if user_id in seen_users or (owner is not None and (student is None or owner != student.id)):
+                item_errors['user'] = unique_errors(fields['user'])
+
+        gender = student.gender if student else Gender.MALE
+        if 'gender' in item:
+            try:
+                gender = fields['gender'].run_validation(item['gender'])
+            except ValidationError as e:
+                item_errors['gender'] = e.detail
+
+        study_group_id = item.get('study_group', student.study_group_id if student else None)
+        if study_group_id is not None:
+            study_group_id, item_errors['study_group'] = related_pk(fields['study_group'], study_group_id, groups)
+
+        item_errors = {field: messages for field, messages in item_errors.items() if messages}
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+            continue
+
+        seen_users.add(user_id)
+        if student is None:
+            valid.append((index, Student(user_id=user_id, gender=gender, study_group_id=study_group_id), None))
+        else:
+            seen_students.add(student.id)
+            previous = (student.study_group_id, student.gender)
+            student.user_id, student.gender, student.study_group_id = user_id, gender, study_group_id
+            valid.append((index, student, previous))
+
+    return valid, errors
+
+
+def save_batch(batch, save, errors, unique):
+    # Another request may take a user between validation and the insert.
+    # Then the batch is retried item by item and only the conflicts fail.
+    # Single items go through save() as a list too: Model.save() would send
+    # post_save and apply the stats delta that bulk_save_students() adds.
+    try:
+        with transaction.atomic():
+            save([student for _, student, _ in batch])
+        return batch
+    except IntegrityError:
+        pass
+
+    saved = []
+    for entry in batch:
+        try:
+            with transaction.atomic():
+                save([entry[1]])
+        except IntegrityError:
+            errors.append({'index': entry[0], 'errors': {'user': unique}})
+        else:
+            saved.append(entry)
+    return saved
+
+
+def bulk_save_students(items):
+    serializer = StudentWriteSerializer()
+    valid, errors = validate_items(items, serializer)
+    unique = unique_errors(serializer.fields['user'])
+
+    now = timezone.now()
+    new = [entry for entry in valid if entry[2] is None]
+    changed = [entry for entry in valid if entry[2] is not None]
+    for _, student, _ in changed:
+        student.updated_at = now
+
+    fields = ['user', 'gender', 'study_group', 'updated_at']
+    created, updated = [], []
+    deltas = Counter()
+
+    with transaction.atomic():
+        for start in range(0, len(new), BATCH_SIZE):
+            created += save_batch(new[start:start + BATCH_SIZE], Student.objects.bulk_create, errors, unique)
+        for start in range(0, len(changed), BATCH_SIZE):
+            updated += save_batch(
+                changed[start:start + BATCH_SIZE], lambda students: Student.objects.bulk_update(students, fields),
+                errors, unique,
+            )
+
+        for _, student, previous in created + updated:
+            if previous is not None:
+                deltas[previous] -= 1
+            deltas[(student.study_group_id, student.gender)] += 1
+        update_student_stats(deltas)
+        if created or updated:
+            bump_versions(Student)
+
+    errors.sort(key=lambda error: error['index'])
+    return [student for _, student, _ in created], [student for _, student, _ in updated], errors
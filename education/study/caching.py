@@ -0,0 +1,158 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ModelVersion
+from .versions import model_label
+
+
+def get_version_stamps(*models):
+    labels = sorted(model_label(model) for model in models)
+    stamps = {label: (version, updated_at) for label, version, updated_at in
+              ModelVersion.objects.filter(label__in=labels).values_list('label', 'version', 'updated_at')}
+    return [(label, *stamps.get(label, (0, None))) for label in labels]
+
+
+def user_cache_role(user):
+    if not user or not user.is_authenticated:
+        return 'anonymous'
+    return f'{user.role}:{int(user.is_staff)}'
+
+
+def has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+class VersionStampsMixin:
+    cache_models = ()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.get_queryset().model, )
+
+    def get_version_stamps(self):
+        if not hasattr(self, '_version_stamps'):
+            self._version_stamps = get_version_stamps(*self.get_cache_models())
+        return self._version_stamps
+
+
+class CachedResponseMixin(VersionStampsMixin):
+    cache_timeout = None
+
+    def get_response_cache(self):
+        return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+    def get_cache_key(self, request):
+        parts = [
+            request.method,
+            request.build_absolute_uri(request.path),
+            repr(sorted(request.query_params.lists())),
+            request.META.get('HTTP_ACCEPT', ''),
+            user_cache_role(request.user),
+            repr(self.get_version_stamps()),
+        ]
+        return 'api:' + hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+
+    def get_cached_response(self, request):
+        data = self.get_response_cache().get(self.get_cache_key(request))
+        if data is not None:
+            return Response(data)
+        return None
+
+    def cache_response(self, request, response):
+        if response.status_code == status.HTTP_200_OK:
+            self.get_response_cache().set(self.get_cache_key(request), response.data, self.get_cache_timeout())
+        return response
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        response = self.get_cached_response(request)
+        if response is None:
+            response = self.cache_response(request, handler(request, *args, **kwargs))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin(VersionStampsMixin):
+
+    def get_object_updated_at(self):
+        model = self.get_queryset().model
+        if not has_updated_at(model):
+            return None
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        try:
+            return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def get_validators(self, request, stamps, updated_at=None):
+        parts = [
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            user_cache_role(request.user),
+            repr(stamps),
+            repr(updated_at),
+        ]
+        etag = quote_etag(hashlib.sha1('\n'.join(parts).encode()).hexdigest())
+
+        timestamps = [stamp_updated_at for _, _, stamp_updated_at in stamps if stamp_updated_at is not None]
+        if updated_at is not None:
+            timestamps.append(updated_at)
+        return etag, int(max(timestamps).timestamp()) if timestamps else None
+
+    def get_list_validators(self, request):
+        return self.get_validators(request, self.get_version_stamps())
+
+    def get_detail_validators(self, request):
+        model = self.get_queryset().model
+        updated_at = self.get_object_updated_at()
+        stamps = self.get_version_stamps()
+        if updated_at is not None:
+            stamps = [stamp for stamp in stamps if stamp[0] != model_label(model)]
+        return self.get_validators(request, stamps, updated_at)
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code not in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            return response
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def not_modified_response(self, request, etag, last_modified):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return self.set_validators(response, etag, last_modified)
+        return None
+
+    def conditional_response(self, handler, request, etag, last_modified, *args, **kwargs):
+        response = self.not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = self.set_validators(handler(request, *args, **kwargs), etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators(request)
+        return self.conditional_response(super().list, request, etag, last_modified, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_detail_validators(request)
+        return self.conditional_response(super().retrieve, request, etag, last_modified, *args, **kwargs)
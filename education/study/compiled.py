@@ -0,0 +1,253 @@
+import threading
+from collections import OrderedDict, defaultdict
+
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, SlugRelatedField
+from rest_framework.response import Response
+
+
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+)
+
+
+class NotCompilable(Exception):
+    pass
+
+
+def get_model_field(model, source):
+    if not source or source == '*' or '.' in source:
+        raise NotCompilable(f'Unsupported source "{source}"')
+    try:
+        field = model._meta.get_field(source)
+    except Exception:
+        raise NotCompilable(f'"{source}" is not a field of {model.__name__}')
+    if field.auto_created and not field.concrete:
+        raise NotCompilable(f'Reverse relation "{source}" is not supported')
+    return field
+
+
+def get_converter(field, model_field):
+    if isinstance(field, serializers.FileField):
+        return None, model_field
+    if isinstance(field, serializers.ChoiceField):
+        if all(key == value for key, value in field.choice_strings_to_values.items()):
+            return None, None
+        return field.to_representation, None
+    if isinstance(field, PrimaryKeyRelatedField):
+        if field.pk_field is not None:
+            raise NotCompilable('pk_field is not supported')
+        return None, None
+    if isinstance(field, IDENTITY_FIELDS):
+        return None, None
+    return field.to_representation, None
+
+
+class Compiler:
+    def __init__(self):
+        self.columns = []
+        self.many = []
+        self.namespace = {}
+
+    def column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return name
+
+    def constant(self, value):
+        name = f'c{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def value_expr(self, column, converter=None, file_field=None):
+        row = f'row[{column!r}]'
+        if file_field is not None:
+            return f'file_url({row}, {self.constant(file_field)}, request)'
+        if converter is None:
+            return row
+        return f'(None if {row} is None else {self.constant(converter)}({row}))'
+
+    def compile(self, serializer, model, prefix='', in_many=False):
+        items = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+
+            if isinstance(nested, serializers.BaseSerializer):
+                model_field = get_model_field(model, field.source)
+                if not model_field.is_relation:
+                    raise NotCompilable(f'Nested serializer on plain field "{field.source}"')
+                if nested is not field or model_field.many_to_many:
+                    if in_many or nested is field:
+                        raise NotCompilable('Nested many-to-many relations are not supported')
+                    expr = self.compile_many(nested, model, model_field, prefix)
+                else:
+                    fk = self.column(prefix + field.source)
+                    child = self.compile(nested, model_field.related_model, f'{prefix}{field.source}__', in_many)
+                    expr = f'(None if row[{fk!r}] is None else {child})'
+            elif isinstance(field, ManyRelatedField):
+                if in_many:
+                    raise NotCompilable('Nested many-to-many relations are not supported')
+                model_field = get_model_field(model, field.source)
+                if not isinstance(field.child_relation, PrimaryKeyRelatedField) or field.child_relation.pk_field is not None:
+                    raise NotCompilable('Only primary key many-to-many fields are supported')
+                expr = self.compile_many(None, model, model_field, prefix)
+            elif isinstance(field, serializers.BaseSerializer):
+                raise NotCompilable(f'Unsupported field "{name}"')
+            elif isinstance(field, SlugRelatedField):
+                model_field = get_model_field(model, field.source)
+                if not model_field.is_relation or model_field.many_to_many:
+                    raise NotCompilable(f'Unsupported field "{name}"')
+                # The raw value is rendered, so a relation only works by its attname.
+                slug_field = get_model_field(model_field.related_model, field.slug_field)
+                if slug_field.is_relation and field.slug_field != slug_field.attname:
+                    raise NotCompilable(f'Unsupported slug field "{field.slug_field}"')
+                expr = self.value_expr(self.column(f'{prefix}{field.source}__{field.slug_field}'))
+            else:
+                model_field = get_model_field(model, field.source)
+                if model_field.many_to_many:
+                    raise NotCompilable(f'Unsupported field "{name}"')
+                converter, file_field = get_converter(field, model_field)
+                expr = self.value_expr(self.column(prefix + field.source), converter, file_field)
+
+            items.append(f'{name!r}: {expr}')
+
+        return '{' + ', '.join(items) + '}'
+
+    def compile_many(self, serializer, model, model_field, prefix):
+        owner = self.column(prefix + model._meta.pk.name)
+        related_model = model_field.related_model
+        query_name = model_field.related_query_name()
+
+        child = Compiler()
+        if serializer is None:
+            source = child.value_expr(child.column(related_model._meta.pk.name))
+        else:
+            source = child.compile(serializer, related_model, in_many=True)
+        build = child.make_builder(source)
+        columns = child.columns
+
+        index = len(self.many)
+        self.many.append((owner, related_model, query_name, columns, build))
+        return f'many[{index}].get(row[{owner!r}], [])'
+
+    def make_builder(self, source):
+        namespace = dict(self.namespace, file_url=file_url)
+        exec(f'def build(row, many, request):\n    return {source}\n', namespace)
+        return namespace['build']
+
+
+def file_url(name, model_field, request):
+    if not name:
+        return None
+    url = FieldFile(None, model_field, name).url
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+class CompiledSerializer:
+    def __init__(self, serializer, model, extra_columns=()):
+        compiler = Compiler()
+        source = compiler.compile(serializer, model)
+        self.build = compiler.make_builder(source)
+        self.many = compiler.many
+        self.columns = list(compiler.columns)
+        for column in extra_columns:
+            if column not in self.columns:
+                self.columns.append(column)
+
+    def get_queryset(self, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(*self.columns)
+
+    def load_many(self, rows, request):
+        loaded = []
+        for owner, related_model, query_name, columns, build in self.many:
+            ids = {row[owner] for row in rows if row[owner] is not None}
+            grouped = defaultdict(list)
+            if ids:
+                queryset = related_model._default_manager.filter(**{f'{query_name}__in': ids}).values(query_name, *columns)
+                for row in queryset:
+                    grouped[row[query_name]].append(build(row, None, request))
+            loaded.append(grouped)
+        return loaded
+
+    async def aload_many(self, rows, request):
+        loaded = []
+        for owner, related_model, query_name, columns, build in self.many:
+            ids = {row[owner] for row in rows if row[owner] is not None}
+            grouped = defaultdict(list)
+            if ids:
+                queryset = related_model._default_manager.filter(**{f'{query_name}__in': ids}).values(query_name, *columns)
+                # Like afetch(): a server-side cursor may get a different plan
+                # and row order than the sync path.
+                async for row in queryset:
+                    grouped[row[query_name]].append(build(row, None, request))
+            loaded.append(grouped)
+        return loaded
+
+    def serialize(self, rows, request=None):
+        rows = list(rows)
+        return self.build_rows(rows, self.load_many(rows, request), request)
+
+    async def aserialize(self, rows, request=None):
+        return self.build_rows(rows, await self.aload_many(rows, request), request)
+
+    def build_rows(self, rows, many, request):
+        build = self.build
+        return [build(row, many, request) for row in rows]
+
+
+COMPILED_CACHE_SIZE = 256
+
+compiled_serializers = OrderedDict()
+compiled_lock = threading.Lock()
+
+
+def shape_key(shape):
+    if shape is None:
+        return None
+    return (
+        tuple(sorted((path, tuple(sorted(names))) for path, names in shape['fields'].items())),
+        tuple(sorted(shape['expand'])),
+    )
+
+
+class CompiledListMixin:
+
+    def get_compiled_serializer(self):
+        # The same serializer can be listed by views with different querysets
+        # and keyset orderings, which end up in the compiled columns.
+        ordering = tuple(getattr(self, 'keyset_ordering', ('id', )))
+        key = (type(self), self.get_serializer_class(), ordering, shape_key(self.get_serializer_context().get('shape')))
+        with compiled_lock:
+            if key in compiled_serializers:
+                compiled_serializers.move_to_end(key)
+                return compiled_serializers[key]
+
+        try:
+            compiled = CompiledSerializer(self.get_serializer(), self.get_queryset().model, ordering)
+        except NotCompilable:
+            compiled = None
+
+        with compiled_lock:
+            compiled_serializers[key] = compiled
+            while len(compiled_serializers) > COMPILED_CACHE_SIZE:
+                compiled_serializers.popitem(last=False)
+        return compiled
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = compiled.get_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page, request))
+        return Response(compiled.serialize(queryset, request))
@@ -0,0 +1,256 @@
+import os
+import threading
+from collections import deque
+from time import monotonic
+
+import psycopg2
+from psycopg2 import extensions
+
+from study.metrics import make_metric
+
+
+POOL_WAIT = make_metric(
+    'Histogram', 'db_pool_wait_seconds', 'Time spent waiting for a pooled database connection', ('alias', ),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+POOL_TIMEOUTS = make_metric(
+    'Counter', 'db_pool_timeouts', 'Checkouts that gave up waiting for a pooled connection', ('alias', ),
+)
+POOL_CONNECTIONS = make_metric(
+    'Gauge', 'db_pool_connections', 'Pooled database connections by state', ('alias', 'state'),
+    multiprocess_mode='livesum',
+)
+POOL_SATURATION = make_metric(
+    'Gauge', 'db_pool_saturation', 'Share of the pool maximum checked out', ('alias', ),
+    multiprocess_mode='max',
+)
+
+DEFAULTS = {
+    'MIN_SIZE': 0,
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10,
+    'CHECK_INTERVAL': 5,
+    'MAX_IDLE': 300,
+    'MAX_LIFETIME': 3600,
+}
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.released_at = monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, alias, connect, options=None):
+        options = {**DEFAULTS, **(options or {})}
+        if options['MAX_SIZE'] < max(1, options['MIN_SIZE']):
+            raise ValueError('POOL MAX_SIZE must be at least 1 and not less than MIN_SIZE')
+
+        self.alias = alias
+        self.connect = connect
+        self.min_size = options['MIN_SIZE']
+        self.max_size = options['MAX_SIZE']
+        self.timeout = options['TIMEOUT']
+        self.check_interval = options['CHECK_INTERVAL']
+        self.max_idle = options['MAX_IDLE']
+        self.max_lifetime = options['MAX_LIFETIME']
+
+        self.idle = deque()
+        self.in_use = {}
+        self.opening = 0
+        self.condition = threading.Condition()
+        self.closed = False
+
+    @property
+    def size(self):
+        return len(self.idle) + len(self.in_use) + self.opening
+
+    def fill(self):
+        while True:
+            with self.condition:
+                if self.size >= self.min_size:
+                    return
+                self.opening += 1
+            try:
+                pooled = PooledConnection(self.connect())
+            finally:
+                with self.condition:
+                    self.opening -= 1
+            self.put_idle(pooled)
+
+    def getconn(self):
+        start = monotonic()
+        deadline = start + self.timeout
+
+        while True:
+            pooled = self.take(deadline)
+            if pooled is None:
+                try:
+                    connection = self.connect()
+                except Exception:
+                    with self.condition:
+                        self.opening -= 1
+                        self.condition.notify()
+                    raise
+                pooled = PooledConnection(connection)
+                with self.condition:
+                    self.opening -= 1
+                    self.in_use[id(connection)] = pooled
+                    self.update_metrics()
+                break
+
+            if self.check(pooled):
+                break
+            self.discard(pooled)
+
+        POOL_WAIT.labels(self.alias).observe(monotonic() - start)
+        return pooled.connection
+
+    def take(self, deadline):
+        # Returns an idle connection, or None after reserving a slot for a new one.
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise psycopg2.OperationalError(f'Connection pool "{self.alias}" is closed')
+                if self.idle:
+                    pooled = self.idle.pop()
+                    self.in_use[id(pooled.connection)] = pooled
+                    self.update_metrics()
+                    return pooled
+                if self.size < self.max_size:
+                    self.opening += 1
+                    return None
+
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    POOL_TIMEOUTS.labels(self.alias).inc()
+                    raise PoolTimeout(
+                        f'Timed out after {self.timeout}s waiting for a connection from pool "{self.alias}" '
+                        f'({self.max_size} in use)'
+                    )
+                self.condition.wait(remaining)
+
+    def check(self, pooled):
+        connection = pooled.connection
+        if connection.closed:
+            return False
+        if monotonic() - pooled.released_at < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def putconn(self, connection):
+        with self.condition:
+            pooled = self.in_use.pop(id(connection), None)
+        if pooled is None:
+            connection.close()
+            return
+
+        if not self.reset(pooled) or self.closed:
+            self.discard(pooled, checked_out=False)
+            return
+
+        pooled.released_at = monotonic()
+        self.put_idle(pooled)
+
+    def reset(self, pooled):
+        connection = pooled.connection
+        if connection.closed or monotonic() - pooled.created_at > self.max_lifetime:
+            return False
+
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+
+    def put_idle(self, pooled):
+        expired = []
+        with self.condition:
+            self.idle.append(pooled)
+            now = monotonic()
+            while len(self.idle) > self.min_size and now - self.idle[0].released_at > self.max_idle:
+                expired.append(self.idle.popleft())
+            self.update_metrics()
+            self.condition.notify()
+
+        for pooled in expired:
+            close_quietly(pooled.connection)
+
+    def discard(self, pooled, checked_out=True):
+        with self.condition:
+            if checked_out:
+                self.in_use.pop(id(pooled.connection), None)
+            self.update_metrics()
+            self.condition.notify()
+        close_quietly(pooled.connection)
+
+    def discard_connection(self, connection):
+        with self.condition:
+            pooled = self.in_use.get(id(connection))
+        if pooled is None:
+            close_quietly(connection)
+        else:
+            self.discard(pooled)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            idle, self.idle = list(self.idle), deque()
+            self.update_metrics()
+            self.condition.notify_all()
+
+        for pooled in idle:
+            close_quietly(pooled.connection)
+
+    def update_metrics(self):
+        POOL_CONNECTIONS.labels(self.alias, 'idle').set(len(self.idle))
+        POOL_CONNECTIONS.labels(self.alias, 'in_use').set(len(self.in_use))
+        POOL_SATURATION.labels(self.alias).set(len(self.in_use) / self.max_size)
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except psycopg2.Error:
+        pass
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, connect, options):
+    key = (os.getpid(), alias, key)
+    with pools_lock:
+        pool = pools.get(key)
+        created = pool is None
+        if created:
+            pool = pools[key] = ConnectionPool(alias, connect, options)
+    if created:
+        pool.fill()
+    return pool
+
+
+def close_pools(alias=None):
+    with pools_lock:
+        keys = [key for key in pools if alias is None or key[1] == alias]
+        closing = [pools.pop(key) for key in keys]
+    for pool in closing:
+        pool.close()
@@ -0,0 +1,34 @@
+from django.db.backends.postgresql import base
+
+from study.db.pool import get_pool
+
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        key = repr(sorted(conn_params.items()))
+        return get_pool(self.alias, key, lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                        self.settings_dict.get('POOL'))
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        connection = pool.getconn()
+        self.pool = pool
+
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get('isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        # A connection closed inside an atomic block stays referenced by the
+        # wrapper until the block exits, so it can't go back to the pool.
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                self.pool.discard_connection(self.connection)
+            else:
+                self.pool.putconn(self.connection)
@@ -0,0 +1,14 @@
+from django.db.backends.postgresql import creation
+
+from study.db.pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def _execute_create_test_db(self, cursor, parameters, keepdb=False):
+        close_pools(self.connection.alias)
+        super()._execute_create_test_db(cursor, parameters, keepdb)
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, quote_etag
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(fieldfile):
+    storage = fieldfile.storage
+    modified = storage.get_modified_time(fieldfile.name).timestamp()
+    key = f'{fieldfile.name}:{fieldfile.size}:{modified}'
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+def parse_range(header, size):
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return False
+    return start, end
+
+
+def iter_range(fileobj, start, end):
+    fileobj.seek(start)
+    remaining = end - start + 1
+    try:
+        while remaining > 0:
+            chunk = fileobj.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def sendfile_response(fieldfile):
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+    if backend == 'nginx':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(getattr(settings, 'SENDFILE_URL', '/protected/') + fieldfile.name)
+        return response
+    if backend == 'apache':
+        response = HttpResponse()
+        response['X-Sendfile'] = fieldfile.path
+        return response
+    return None
+
+
+def file_response(request, fieldfile):
+    etag = file_etag(fieldfile)
+    size = fieldfile.size
+    filename = os.path.basename(fieldfile.name)
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    response = sendfile_response(fieldfile)
+    if response is not None:
+        response['Content-Disposition'] = f"attachment; filename*=utf-8''{quote(filename)}"
+        response['Content-Type'] = 'application/octet-stream'
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    fileobj = fieldfile.storage.open(fieldfile.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(fileobj, as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(iter_range(fileobj, start, end), status=206, content_type='application/octet-stream')
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Disposition'] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(fieldfile.storage.get_modified_time(fieldfile.name).timestamp())
+    return response
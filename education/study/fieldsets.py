@@ -0,0 +1,108 @@
+from collections import defaultdict
+
+from django.db.models import Prefetch
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, SlugRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+def split_param(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def parse_shape(query_params, fields_param='fields', expand_param='expand'):
+    if fields_param not in query_params and expand_param not in query_params:
+        return None
+
+    fields = defaultdict(set)
+    expand = set()
+
+    for item in split_param(query_params.get(expand_param)):
+        parts = tuple(item.split('.'))
+        for i in range(1, len(parts) + 1):
+            expand.add(parts[:i])
+
+    for item in split_param(query_params.get(fields_param)):
+        parts = tuple(item.split('.'))
+        for i in range(len(parts)):
+            fields[parts[:i]].add(parts[i])
+            if i:
+                expand.add(parts[:i])
+
+    return {'fields': dict(fields), 'expand': expand}
+
+
+def serializer_path(serializer):
+    path = []
+    while serializer.parent is not None:
+        if serializer.field_name:
+            path.insert(0, serializer.field_name)
+        serializer = serializer.parent
+    return tuple(path)
+
+
+def related_lookups(serializer, prefix='', in_prefetch=False):
+    select, prefetch = [], []
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+
+    for field in serializer.fields.values():
+        if field.source == '*':
+            continue
+        lookup = prefix + field.source.replace('.', '__')
+        nested = field.child if isinstance(field, ListSerializer) else field
+
+        if isinstance(nested, BaseSerializer):
+            many = nested is not field
+            if many or in_prefetch:
+                prefetch.append(lookup)
+            else:
+                select.append(lookup)
+            nested_select, nested_prefetch = related_lookups(nested, lookup + '__', many or in_prefetch)
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+        elif isinstance(field, SlugRelatedField):
+            # A collapsed serializer rendered by another field of the related row.
+            if in_prefetch:
+                prefetch.append(lookup)
+            else:
+                select.append(lookup)
+        elif isinstance(field, ManyRelatedField) and model is not None:
+            related_model = model._meta.get_field(field.source).related_model
+            columns = ['pk']
+            if isinstance(field.child_relation, SlugRelatedField):
+                columns.append(field.child_relation.slug_field)
+            prefetch.append(Prefetch(lookup, queryset=related_model.objects.only(*columns)))
+
+    return select, prefetch
+
+
+class ExpandableViewMixin:
+
+    def get_shape(self):
+        if not hasattr(self, '_shape'):
+            request = getattr(self, 'request', None)
+            if request is None or request.method not in SAFE_METHODS:
+                self._shape = None
+            else:
+                self._shape = parse_shape(request.query_params)
+        return self._shape
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        shape = self.get_shape()
+        if shape is not None:
+            context['shape'] = shape
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_shape() is None:
+            return queryset
+
+        select, prefetch = related_lookups(self.get_serializer())
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
@@ -0,0 +1,103 @@
+from django.contrib.admin.utils import get_fields_from_path, lookup_spawns_duplicates
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.db.models.lookups import StartsWith
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .fieldsets import split_param
+
+
+FUZZY_MIN_LENGTH = 3
+
+trigram_support = {}
+
+
+def has_trigram(alias):
+    if alias not in trigram_support:
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            trigram_support[alias] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                trigram_support[alias] = cursor.fetchone() is not None
+    return trigram_support[alias]
+
+
+class FieldFilterBackend(BaseFilterBackend):
+    # filter_fields maps query parameters to lookups; ?course=1,2 matches either.
+
+    def get_filter_fields(self, view):
+        return getattr(view, 'filter_fields', {})
+
+    def get_values(self, model, param, lookup, value):
+        field = get_fields_from_path(model, lookup)[-1]
+        if field.is_relation:
+            field = field.target_field
+
+        values = []
+        for item in split_param(value):
+            try:
+                values.append(field.clean(item, None))
+            except DjangoValidationError as e:
+                raise ValidationError({param: e.messages})
+        return values
+
+    def filter_queryset(self, request, queryset, view):
+        model = queryset.model
+        for param, lookup in self.get_filter_fields(view).items():
+            if param not in request.query_params:
+                continue
+
+            values = self.get_values(model, param, lookup, request.query_params[param])
+            condition = Q(**{f'{lookup}__in': values})
+            if lookup_spawns_duplicates(model._meta, lookup):
+                # Matching through a many-to-many relation in a subquery keeps
+                # rows unique without DISTINCT, which the keyset ordering would
+                # have to sort.
+                condition = Q(pk__in=model._default_manager.filter(condition).values('pk'))
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class NameSearchBackend(BaseFilterBackend):
+    # ?search= matches rows where every word starts one of search_fields, or,
+    # with pg_trgm, is similar to a word in one of them. The GIN indexes on
+    # UPPER(field) from migration 0009 serve both.
+    search_param = 'search'
+
+    def get_search_fields(self, view):
+        return getattr(view, 'search_fields', ())
+
+    def get_search_terms(self, request):
+        value = request.query_params.get(self.search_param, '')
+        return value.replace('\x00', '').upper().split()
+
+    def term_condition(self, fields, term, fuzzy):
+        condition = Q()
+        for field in fields:
+            condition |= Q(StartsWith(Upper(field), term))
+            if fuzzy and len(term) >= FUZZY_MIN_LENGTH:
+                condition |= Q(TrigramWordSimilar(Upper(field), term))
+        return condition
+
+    def prepare(self, request, view):
+        # Looks up pg_trgm ahead of filter_queryset(), which async views call
+        # outside of a thread where the database can be queried.
+        if self.get_search_fields(view) and self.get_search_terms(request):
+            has_trigram(view.get_queryset().db)
+
+    def filter_queryset(self, request, queryset, view):
+        fields = self.get_search_fields(view)
+        terms = self.get_search_terms(request)
+        if not fields or not terms:
+            return queryset
+
+        fuzzy = has_trigram(queryset.db)
+        for term in terms:
+            queryset = queryset.filter(self.term_condition(fields, term, fuzzy))
+        return queryset
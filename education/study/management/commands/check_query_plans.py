@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from study.benchmarks import datasets
+from study.benchmarks.plans import check_query_plans
+from study.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN ANALYZE for the queries of every API endpoint on a synthetic dataset and fail on large sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000, help='Number of students')
+        parser.add_argument('--max-seq-rows', type=int, default=10000, help='Most rows a sequential scan may read')
+        parser.add_argument('--case', action='append', dest='cases', help='Only check cases with this name prefix')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the database between runs (it is seeded once)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if not Student.objects.exists():
+                self.stdout.write(f'Seeding {options["size"]} students')
+                datasets.seed(options['size'])
+            violations = check_query_plans(
+                options['max_seq_rows'], cases=options['cases'],
+                log=self.stdout.write if options['verbosity'] > 1 else lambda line: None,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        for name, relation, rows, sql in violations:
+            self.stdout.write(f'{name:<24} Seq Scan on {relation}: {rows} rows\n    {sql}')
+        if violations:
+            raise CommandError(f'{len(violations)} sequential scan(s) over {options["max_seq_rows"]} rows')
+        self.stdout.write(self.style.SUCCESS('No sequential scans over the threshold'))
@@ -0,0 +1,36 @@
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from study.roster import import_roster, RosterError
+
+
+class Command(BaseCommand):
+    help = ('Import students from a CSV file with the columns username, first_name, last_name, '
+            'gender, group and course. Requires PostgreSQL')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file, or - to read from stdin')
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            f = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            f = open(options['path'], newline='', encoding='utf-8-sig')
+
+        try:
+            with f:
+                result = import_roster(f, progress=lambda rows: self.stdout.write(f'Read {rows} row(s)'))
+        except RosterError as e:
+            raise CommandError(e)
+
+        for error in result['errors']:
+            self.stdout.write(f'Line {error["line"]}: {"; ".join(error["errors"])}')
+
+        self.stdout.write(
+            f'Imported {result["rows"] - result["skipped"]} of {result["rows"]} row(s): '
+            f'{result["courses_created"]} course(s) and {result["groups_created"]} group(s) created, '
+            f'{result["users_created"]} user(s) created and {result["users_updated"]} updated, '
+            f'{result["students_created"]} student(s) created and {result["students_updated"]} updated'
+        )
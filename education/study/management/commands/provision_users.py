@@ -0,0 +1,47 @@
+import csv
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from study.provisioning import provision_users, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Create users and their API tokens from a CSV file with the columns '
+            'username, first_name, last_name, email, role and an optional password')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file, or - to read from stdin')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--tokens-output', help='Write username,token pairs of the created users to this CSV file')
+        parser.add_argument('--hash-workers', type=int, default=os.cpu_count(),
+                            help='Processes hashing the passwords given in the file')
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            f = sys.stdin
+        else:
+            f = open(options['path'], newline='', encoding='utf-8')
+
+        with f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or 'username' not in reader.fieldnames:
+                raise CommandError('CSV file must have a username column')
+            created, skipped, errors = provision_users(reader, batch_size=options['batch_size'], hash_workers=options['hash_workers'])
+
+        if options['tokens_output']:
+            usernames = {user.pk: user.username for user in created}
+            with open(options['tokens_output'], 'w', newline='', encoding='utf-8') as out:
+                writer = csv.writer(out)
+                writer.writerow(('username', 'token'))
+                for user_id, key in Token.objects.filter(user_id__in=usernames).values_list('user_id', 'key').iterator():
+                    writer.writerow((usernames[user_id], key))
+
+        for username in skipped:
+            self.stdout.write(f'Skipped existing user {username}')
+        for error in errors:
+            messages = '; '.join(f'{field}: {" ".join(field_errors)}' for field, field_errors in error['errors'].items())
+            self.stdout.write(f'Invalid row {error["row"]} ({error["username"]}): {messages}')
+        self.stdout.write(f'Created {len(created)} user(s), skipped {len(skipped)}, invalid {len(errors)}')
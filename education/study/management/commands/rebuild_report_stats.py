@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from study.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild report aggregates from scratch and print any drift found'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drift, do not fix it')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = rebuild_stats(dry_run=options['dry_run'])
+
+        for kind, pk, stored, actual in drift:
+            self.stdout.write(f'{kind} {pk}: stored {stored}, actual {actual}')
+
+        self.stdout.write(f'Drift found in {len(drift)} row(s)')
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from study.benchmarks import datasets
+from study.benchmarks.runner import run_benchmarks, compare, slow_compiled, load, dump
+
+
+class Command(BaseCommand):
+    help = 'Run serializer and viewset microbenchmarks on synthetic datasets in a separate test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,100000,1000000', help='Comma separated numbers of students')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--case', action='append', dest='cases', help='Only run cases with this name prefix')
+        parser.add_argument('--output', default='bench_output.json')
+        parser.add_argument('--baseline', help='JSON file produced by an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown against the baseline')
+        parser.add_argument('--concurrency', help='Comma separated numbers of concurrent clients; compares WSGI and ASGI throughput')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per concurrency level')
+        parser.add_argument('--threads', type=int, default=4, help='Worker threads of the simulated WSGI server')
+        parser.add_argument('--p99-budget', type=float, default=100, help='p99 latency in ms used to report the sustained concurrency')
+        parser.add_argument('--db-latency', type=float, default=0, help='Delay in ms added to every query in the concurrency cases')
+        parser.add_argument('--min-speedup', type=float, default=3,
+                            help='Fail when a compiled serializer is not this many times faster than the DRF one '
+                                 'on a full page; 0 disables')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database between runs')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        concurrency = [int(level) for level in options['concurrency'].split(',')] if options['concurrency'] else None
+        baseline = load(options['baseline']) if options['baseline'] else None
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            results = run_benchmarks(
+                sizes, options['iterations'], datasets.seed, datasets.clear,
+                cases=options['cases'], log=self.stdout.write,
+                concurrency=concurrency, requests=options['requests'],
+                threads=options['threads'], p99_budget=options['p99_budget'],
+                db_latency=options['db_latency'] / 1000,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        dump(results, options['output'])
+        self.stdout.write(f'Results written to {options["output"]}')
+
+        slow = slow_compiled(results, options['min_speedup'])
+        for size, name, speedup in slow:
+            self.stdout.write(f'{size:>9} {"speedup:" + name:<40} {speedup}x < {options["min_speedup"]}x')
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['tolerance'])
+            for size, name, metric, previous, current in regressions:
+                self.stdout.write(f'{size:>9} {name:<40} {metric}: {previous} -> {current}')
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+        if slow:
+            raise CommandError(f'{len(slow)} compiled serializer(s) below {options["min_speedup"]}x')
@@ -0,0 +1,37 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from study.worker import process_next_report, requeue_stale_reports
+
+
+class Command(BaseCommand):
+    help = 'Process queued reports. Several workers may run on different nodes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--stale-timeout', type=int, default=3600, help='Seconds after which a report stuck in processing is requeued')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while self.running:
+            requeued = requeue_stale_reports(options['stale_timeout'])
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale report(s)')
+
+            report = process_next_report()
+            if report is not None:
+                self.stdout.write(f'Report {report.id} ({report.type}): {report.status}')
+                continue
+
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+    def stop(self, signum, frame):
+        self.running = False
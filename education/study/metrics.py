@@ -0,0 +1,78 @@
+import os
+
+from django.db.models import Count
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+
+class NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def dec(self, *args, **kwargs):
+        pass
+
+    def set(self, *args, **kwargs):
+        pass
+
+    def observe(self, *args, **kwargs):
+        pass
+
+
+def make_metric(kind, name, documentation, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+REQUEST_LABELS = ('view', 'action', 'method', 'status')
+
+REQUEST_LATENCY = make_metric(
+    'Histogram', 'api_request_duration_seconds', 'Request latency', REQUEST_LABELS,
+)
+REQUEST_DB_QUERIES = make_metric(
+    'Histogram', 'api_request_db_queries', 'Database queries per request', REQUEST_LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+REQUEST_DB_TIME = make_metric(
+    'Histogram', 'api_request_db_duration_seconds', 'Database time per request', REQUEST_LABELS,
+)
+RESPONSE_SIZE = make_metric(
+    'Histogram', 'api_response_size_bytes', 'Response body size', REQUEST_LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+
+class ReportQueueCollector:
+    def describe(self):
+        return []
+
+    def collect(self):
+        from .models import Report, Status
+
+        counts = dict(Report.objects.values_list('status').annotate(count=Count('id')).order_by())
+        metric = GaugeMetricFamily('report_queue_depth', 'Reports by status', labels=['status'])
+        for value, _ in Status.choices:
+            metric.add_metric([value], counts.get(value, 0))
+        yield metric
+
+
+def generate_metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+
+    queue_registry = prometheus_client.CollectorRegistry()
+    queue_registry.register(ReportQueueCollector())
+
+    return prometheus_client.generate_latest(registry) + prometheus_client.generate_latest(queue_registry)
@@ -0,0 +1,151 @@
+from contextlib import ExitStack
+from time import perf_counter, time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import prometheus_client, REQUEST_LATENCY, REQUEST_DB_QUERIES, REQUEST_DB_TIME, RESPONSE_SIZE
+from .routers import get_replicas, replica_reads
+
+
+PIN_COOKIE = 'db_pin'
+PIN_HEADER = 'X-DB-Pin'
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - start
+
+
+def watch_queries(stack, stats):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+
+
+def resolve_view_labels(view_func, method):
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None) or {}
+    view = cls.__name__ if cls is not None else getattr(view_func, '__name__', 'unknown')
+    return view, actions.get(method.lower(), method.lower())
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if prometheus_client is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats = QueryStats()
+        start = perf_counter()
+
+        with ExitStack() as stack:
+            watch_queries(stack, stats)
+            response = self.get_response(request)
+
+        self.observe(request, response, stats, perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        start = perf_counter()
+
+        # Database connections are per thread, and the ORM runs on the
+        # request's sync thread under ASGI, so the wrappers are installed there.
+        stack = ExitStack()
+        await sync_to_async(watch_queries)(stack, stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        self.observe(request, response, stats, perf_counter() - start)
+        return response
+
+    def observe(self, request, response, stats, duration):
+        view, action = getattr(request, '_metrics_view', ('unknown', 'unknown'))
+        labels = (view, action, request.method, str(response.status_code))
+
+        REQUEST_LATENCY.labels(*labels).observe(duration)
+        REQUEST_DB_QUERIES.labels(*labels).observe(stats.count)
+        REQUEST_DB_TIME.labels(*labels).observe(stats.duration)
+
+        if response.streaming:
+            size = response.get('Content-Length')
+        else:
+            size = len(response.content)
+        if size is not None:
+            RESPONSE_SIZE.labels(*labels).observe(int(size))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view = resolve_view_labels(view_func, request.method)
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with replica_reads(self.use_replica(request)):
+            response = self.get_response(request)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        with replica_reads(self.use_replica(request)):
+            response = await self.get_response(request)
+        return self.pin(request, response)
+
+    def get_pin_seconds(self):
+        return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+    def pinned_until(self, request):
+        value = request.COOKIES.get(PIN_COOKIE) or request.headers.get(PIN_HEADER)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0
+
+    def use_replica(self, request):
+        return request.method in SAFE_METHODS and self.pinned_until(request) < time()
+
+    def pin(self, request, response):
+        # Clients that wrote are read from the primary for a while, so they see
+        # their own writes. API clients without cookies can echo the header.
+        if request.method in SAFE_METHODS:
+            return response
+
+        seconds = self.get_pin_seconds()
+        until = str(int(time() + seconds) + 1)
+        response.set_cookie(PIN_COOKIE, until, max_age=seconds + 1, httponly=True, samesite='Lax')
+        response[PIN_HEADER] = until
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study', '0002_report_report_unique_status_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата начала обработки'),
+        ),
+    ]
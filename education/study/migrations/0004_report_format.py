@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study', '0003_report_started_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='format',
+            field=models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel')], default='csv', max_length=10, verbose_name='Формат файла'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.1.13 on 2026-10-18 13:13
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def populate_stats(apps, schema_editor):
+    StudyGroup = apps.get_model('study', 'StudyGroup')
+    Course = apps.get_model('study', 'Course')
+    StudyGroupStats = apps.get_model('study', 'StudyGroupStats')
+    CourseStats = apps.get_model('study', 'CourseStats')
+
+    groups = StudyGroup.objects.annotate(
+        students_count=Count('student'),
+        male_count=Count('student', filter=Q(student__gender='MALE')),
+        female_count=Count('student', filter=Q(student__gender='FEMALE')),
+    ).values_list('id', 'students_count', 'male_count', 'female_count')
+    StudyGroupStats.objects.bulk_create(
+        [StudyGroupStats(study_group_id=row[0], students_count=row[1], male_count=row[2], female_count=row[3]) for row in groups],
+        batch_size=1000,
+    )
+
+    groups = dict(Course.objects.annotate(value=Count('studygroup')).values_list('id', 'value'))
+    students = dict(Course.objects.annotate(value=Count('studygroup__student')).values_list('id', 'value'))
+    subjects = dict(Course.objects.annotate(value=Count('subjects')).values_list('id', 'value'))
+    CourseStats.objects.bulk_create(
+        [CourseStats(course_id=course_id, groups_count=groups[course_id], students_count=students[course_id], subjects_count=subjects[course_id]) for course_id in groups],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study', '0004_report_format'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='study.course')),
+                ('groups_count', models.IntegerField(default=0, verbose_name='Количество групп')),
+                ('students_count', models.IntegerField(default=0, verbose_name='Количество студентов')),
+                ('subjects_count', models.IntegerField(default=0, verbose_name='Количество дисциплин')),
+            ],
+            options={
+                'verbose_name': 'Статистика курса',
+                'verbose_name_plural': 'Статистика курсов',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudyGroupStats',
+            fields=[
+                ('study_group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='study.studygroup')),
+                ('students_count', models.IntegerField(default=0, verbose_name='Количество студентов')),
+                ('male_count', models.IntegerField(default=0, verbose_name='Количество студентов мужского пола')),
+                ('female_count', models.IntegerField(default=0, verbose_name='Количество студентов женского пола')),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
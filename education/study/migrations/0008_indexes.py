@@ -0,0 +1,38 @@
+# Generated by Django 4.1.13 on 2026-10-18 13:57
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built without locking the tables against writes, which
+    # can't happen inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('study', '0007_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='course',
+            index=models.Index(fields=['name', 'id'], name='study_course_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='report',
+            index=models.Index(fields=['status', 'type', 'created_at'], name='study_report_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='report',
+            index=models.Index(fields=['created_at', 'id'], name='study_report_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='subject',
+            index=models.Index(fields=['name', 'id'], name='study_subject_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['role', 'id'], name='study_user_role_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+# GIN trigram indexes for NameSearchBackend. pg_trgm is an extension that
+# isn't available on every server, so without it the migration does nothing
+# and search falls back to unindexed prefix matching.
+TRIGRAM_INDEXES = [
+    ('study_user_first_name_trgm', 'study_user', 'first_name'),
+    ('study_user_last_name_trgm', 'study_user', 'last_name'),
+    ('study_course_name_trgm', 'study_course', 'name'),
+    ('study_studygroup_name_trgm', 'study_studygroup', 'name'),
+]
+
+
+def has_pg_trgm(cursor):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    return cursor.fetchone() is not None
+
+
+def create_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        if not has_pg_trgm(cursor):
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in TRIGRAM_INDEXES:
+            cursor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}) gin_trgm_ops)')
+
+
+def drop_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name, table, column in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('study', '0008_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -6,6 +6,8 @@ from django.db.models import Q
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+from .provisioning import defer_token
+
 
 class Role(models.TextChoices):
     ADMIN = 'admin', 'админ'
@@ -23,6 +25,11 @@ class ReportType(models.TextChoices):
     GROUP = 'groups_report', 'отчет о группах'
 
 
+class ReportFormat(models.TextChoices):
+    CSV = 'csv', 'CSV'
+    XLSX = 'xlsx', 'Excel'
+
+
 class Status(models.TextChoices):
     CREATED = 'created', 'создан'
     PROCESSED = 'processed', 'обрабатывается'
@@ -33,9 +40,16 @@ class Status(models.TextChoices):
 class User(AbstractUser):
     role = models.CharField(max_length=50, choices=Role.choices, null=True, blank=True, verbose_name='Статус пользователя')
 
+    class Meta(AbstractUser.Meta):
+        swappable = 'AUTH_USER_MODEL'
+        indexes = [
+            models.Index(fields=['role', 'id'], name='study_user_role_idx'),
+        ]
+
 
 class Tutor(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
 
     def __str__(self):
         return f'{self.user.first_name} {self.user.last_name}'
@@ -49,6 +63,7 @@ class Student(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     gender = models.CharField(max_length=50, choices=Gender.choices, default=Gender.MALE, verbose_name='Пол')
     study_group = models.ForeignKey('StudyGroup', on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Учебная группа')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
 
     def __str__(self):
         return f'{self.user.first_name} {self.user.last_name}'
@@ -61,6 +76,7 @@ class Student(models.Model):
 class StudyGroup(models.Model):
     name = models.CharField(max_length=255, verbose_name='Название группы')
     course = models.ForeignKey('Course', on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
 
     def __str__(self):
         return self.name
@@ -72,6 +88,7 @@ class StudyGroup(models.Model):
 
 class Subject(models.Model):
     name = models.CharField(max_length=255, verbose_name='Название дисциплины')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
 
     def __str__(self):
         return self.name
@@ -79,12 +96,16 @@ class Subject(models.Model):
     class Meta:
         verbose_name = 'Дисциплина'
         verbose_name_plural = 'Дисциплины'
+        indexes = [
+            models.Index(fields=['name', 'id'], name='study_subject_name_idx'),
+        ]
 
 
 class Course(models.Model):
     name = models.CharField(max_length=255, verbose_name='Название курса')
     tutor = models.ForeignKey(Tutor, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Куратор')
     subjects = models.ManyToManyField(Subject, related_name='course_subjects')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
 
     def __str__(self):
         return self.name
@@ -92,13 +113,19 @@ class Course(models.Model):
     class Meta:
         verbose_name = 'Курс'
         verbose_name_plural = 'Курсы'
+        indexes = [
+            models.Index(fields=['name', 'id'], name='study_course_name_idx'),
+        ]
 
 
 class Report(models.Model):
     type = models.CharField(max_length=50, choices=ReportType.choices, default=ReportType.COURSE, verbose_name='Тип отчета')
     status = models.CharField(max_length=50, choices=Status.choices, default=Status.CREATED, verbose_name='Статус отчета')
+    format = models.CharField(max_length=10, choices=ReportFormat.choices, default=ReportFormat.CSV, verbose_name='Формат файла')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата начала обработки')
     file = models.FileField(upload_to=f'reports/', verbose_name='Ссылка на скачивание', blank=True, null=True)
+    watermark = models.CharField(max_length=64, blank=True, verbose_name='Версия данных')
 
     def __str__(self):
         return f'{self.type} {self.created_at}'
@@ -109,9 +136,48 @@ class Report(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['type'], condition=(Q(status=Status.CREATED) | Q(status=Status.PROCESSED)), name='unique_status_type')
         ]
+        indexes = [
+            models.Index(fields=['status', 'type', 'created_at'], name='study_report_status_idx'),
+            models.Index(fields=['created_at', 'id'], name='study_report_created_idx'),
+        ]
+
+
+class StudyGroupStats(models.Model):
+    study_group = models.OneToOneField(StudyGroup, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    students_count = models.IntegerField(default=0, verbose_name='Количество студентов')
+    male_count = models.IntegerField(default=0, verbose_name='Количество студентов мужского пола')
+    female_count = models.IntegerField(default=0, verbose_name='Количество студентов женского пола')
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+
+class CourseStats(models.Model):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    groups_count = models.IntegerField(default=0, verbose_name='Количество групп')
+    students_count = models.IntegerField(default=0, verbose_name='Количество студентов')
+    subjects_count = models.IntegerField(default=0, verbose_name='Количество дисциплин')
+
+    class Meta:
+        verbose_name = 'Статистика курса'
+        verbose_name_plural = 'Статистика курсов'
+
+
+class ModelVersion(models.Model):
+    label = models.CharField(max_length=100, primary_key=True, verbose_name='Модель')
+    version = models.BigIntegerField(default=0, verbose_name='Версия')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
+
+    def __str__(self):
+        return f'{self.label} {self.version}'
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
-    if created:
+    if created and not defer_token(instance):
         Token.objects.create(user=instance)
@@ -0,0 +1,36 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    loads = orjson.loads
+    DECODE_ERRORS = (orjson.JSONDecodeError, )
+else:
+    loads = None
+    DECODE_ERRORS = ()
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if loads is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read()
+        try:
+            return loads(data)
+        except DECODE_ERRORS:
+            return super().parse(io.BytesIO(data), media_type, parser_context)
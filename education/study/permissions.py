@@ -25,6 +25,16 @@ class IsAdmin(BasePermission):
         )
 
 
+class IsAdminOnly(BasePermission):
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user and
+            request.user.is_authenticated and
+            request.user.role == Role.ADMIN
+        )
+
+
 class IsTutor(BasePermission):
 
     def has_permission(self, request, view):
@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+
+BATCH_SIZE = 1000
+
+USER_FIELDS = ('username', 'first_name', 'last_name', 'email', 'role')
+
+deferred_tokens = ContextVar('deferred_tokens', default=None)
+
+
+def defer_token(user):
+    pending = deferred_tokens.get()
+    if pending is None:
+        return False
+    pending.append(user.pk)
+    return True
+
+
+@contextmanager
+def defer_token_creation(batch_size=BATCH_SIZE):
+    pending = []
+    reset_token = deferred_tokens.set(pending)
+    try:
+        with transaction.atomic():
+            yield
+            create_tokens(pending, batch_size=batch_size)
+    finally:
+        deferred_tokens.reset(reset_token)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def create_tokens(user_ids, batch_size=BATCH_SIZE):
+    tokens = []
+    for batch in batched(user_ids, batch_size):
+        existing = set(Token.objects.filter(user_id__in=batch).values_list('user_id', flat=True))
+        tokens.extend(Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user_id=user_id) for user_id in batch if user_id not in existing
+        ))
+    return tokens
+
+
+def validate_row(row, User, seen):
+    from .models import Role
+
+    errors = {}
+    for name in USER_FIELDS:
+        if name == 'role':
+            continue
+        try:
+            User._meta.get_field(name).clean(row.get(name) or '', None)
+        except ValidationError as e:
+            errors[name] = e.messages
+
+    username = row.get('username') or ''
+    if username in seen:
+        errors.setdefault('username', []).append(f'"{username}" is repeated in the file')
+
+    # bulk_create() doesn't run full_clean(), so choices are checked here.
+    role = row.get('role') or None
+    if role is not None and role not in Role.values:
+        errors['role'] = [f'"{role}" is not a valid role']
+    return errors
+
+
+def hash_passwords(passwords, executor=None, workers=1):
+    # Each hash costs the full PBKDF2 iteration count by design, which dominates
+    # large imports with passwords; an executor spreads it over processes.
+    if executor is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def provision_users(rows, batch_size=BATCH_SIZE, hash_workers=None):
+    from .versions import bump_versions
+
+    User = get_user_model()
+    created, skipped, errors = [], [], []
+    seen = set()
+
+    executor = ProcessPoolExecutor(hash_workers) if hash_workers and hash_workers > 1 else None
+    with executor or nullcontext(), transaction.atomic():
+        number = 0
+        for batch in batched(rows, batch_size):
+            usernames = [row.get('username') or '' for row in batch]
+            existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+            users, passwords = [], []
+            for row in batch:
+                number += 1
+                username = row.get('username') or ''
+                if username in existing and username not in seen:
+                    skipped.append(username)
+                    continue
+
+                row_errors = validate_row(row, User, seen)
+                seen.add(username)
+                if row_errors:
+                    errors.append({'row': number, 'username': username, 'errors': row_errors})
+                    continue
+
+                user = User(**{field: row.get(field) or '' for field in USER_FIELDS})
+                user.role = row.get('role') or None
+                if row.get('password'):
+                    passwords.append((user, row['password']))
+                else:
+                    user.set_unusable_password()
+                users.append(user)
+
+            hashed = hash_passwords([password for _, password in passwords], executor, hash_workers)
+            for (user, _), password in zip(passwords, hashed):
+                user.password = password
+
+            users = User.objects.bulk_create(users)
+            create_tokens([user.pk for user in users], batch_size=batch_size)
+            created.extend(users)
+
+        if created:
+            bump_versions(User)
+
+    return created, skipped, errors
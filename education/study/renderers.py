@@ -0,0 +1,63 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+encoder = encoders.JSONEncoder()
+
+
+def default(obj):
+    return encoder.default(obj)
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps(data):
+        return orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+
+    ENCODE_ERRORS = (orjson.JSONEncodeError, )
+else:
+    dumps = None
+    ENCODE_ERRORS = ()
+
+
+def has_foreign_floats(data):
+    # orjson writes NaN and infinity as null where JSONRenderer raises, and
+    # formats exponents differently (1e16 vs 1e+16) outside of this range.
+    stack = [[data]]
+    while stack:
+        obj = stack.pop()
+        for value in (obj.values() if isinstance(obj, dict) else obj):
+            kind = type(value)
+            if kind is str or kind is int or kind is bool or value is None:
+                continue
+            if isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+            elif isinstance(value, float) and not (value == 0 or 1e-4 <= abs(value) < 1e16):
+                return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if dumps is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None or has_foreign_floats(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = dumps(data)
+        except ENCODE_ERRORS:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,127 @@
+import csv
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.db.models.functions import Coalesce
+
+from .models import User, Tutor, Student, StudyGroup, Subject, Course, Report, ReportType, ReportFormat, Status
+from .versions import data_watermark
+
+
+def get_chunk_size():
+    return getattr(settings, 'REPORT_CHUNK_SIZE', 2000)
+
+
+def course_report():
+    yield ('ID', 'Курс', 'Куратор', 'Количество дисциплин', 'Количество групп', 'Количество студентов')
+
+    queryset = Course.objects.annotate(
+        subjects_count=Coalesce('stats__subjects_count', 0),
+        groups_count=Coalesce('stats__groups_count', 0),
+        students_count=Coalesce('stats__students_count', 0),
+    ).order_by('name', 'id').values_list(
+        'id', 'name', 'tutor__user__first_name', 'tutor__user__last_name', 'subjects_count', 'groups_count', 'students_count'
+    )
+
+    for course_id, name, first_name, last_name, *counts in queryset.iterator(chunk_size=get_chunk_size()):
+        tutor = f'{first_name} {last_name}' if first_name is not None else ''
+        yield (course_id, name, tutor, *counts)
+
+
+def groups_report():
+    yield ('ID', 'Группа', 'Курс', 'Количество студентов', 'Мужчин', 'Женщин')
+
+    queryset = StudyGroup.objects.annotate(
+        students_count=Coalesce('stats__students_count', 0),
+        male_count=Coalesce('stats__male_count', 0),
+        female_count=Coalesce('stats__female_count', 0),
+    ).order_by('course__name', 'name', 'id').values_list(
+        'id', 'name', 'course__name', 'students_count', 'male_count', 'female_count'
+    )
+
+    yield from queryset.iterator(chunk_size=get_chunk_size())
+
+
+REPORT_GENERATORS = {
+    ReportType.COURSE: course_report,
+    ReportType.GROUP: groups_report,
+}
+
+
+class CsvReportWriter:
+    extension = 'csv'
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.writer = csv.writer(fileobj)
+
+    @classmethod
+    def open_file(cls):
+        return tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
+
+    def write_row(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.fileobj.flush()
+
+
+class XlsxReportWriter:
+    extension = 'xlsx'
+
+    def __init__(self, fileobj):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImproperlyConfigured('openpyxl is required for XLSX reports')
+
+        self.fileobj = fileobj
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+
+    @classmethod
+    def open_file(cls):
+        return tempfile.TemporaryFile(mode='w+b')
+
+    def write_row(self, row):
+        self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.fileobj)
+
+
+REPORT_DEPENDENCIES = {
+    ReportType.COURSE: (Course, Subject, Tutor, User, StudyGroup, Student),
+    ReportType.GROUP: (StudyGroup, Course, Student),
+}
+
+
+def report_watermark(report_type):
+    return data_watermark(*REPORT_DEPENDENCIES[report_type])
+
+
+def find_reusable_report(report_type, report_format, watermark):
+    return Report.objects.filter(
+        type=report_type, format=report_format, status=Status.COMPLETED, watermark=watermark
+    ).exclude(file='').exclude(file__isnull=True).order_by('-created_at', '-id').first()
+
+
+REPORT_WRITERS = {
+    ReportFormat.CSV: CsvReportWriter,
+    ReportFormat.XLSX: XlsxReportWriter,
+}
+
+
+def build_report(report):
+    writer_class = REPORT_WRITERS[report.format]
+
+    with writer_class.open_file() as tmp:
+        writer = writer_class(tmp)
+        for row in REPORT_GENERATORS[report.type]():
+            writer.write_row(row)
+        writer.close()
+
+        tmp.seek(0)
+        report.file.save(f'{report.type}_{report.id}.{writer_class.extension}', File(tmp), save=False)
@@ -0,0 +1,241 @@
+import csv
+import io
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+from .models import User, Student, StudyGroup, Course, Role, Gender
+from .provisioning import create_tokens
+from .stats import refresh_group_stats, refresh_course_stats
+from .versions import bump_versions
+
+
+COLUMNS = ('username', 'first_name', 'last_name', 'gender', 'group', 'course')
+REQUIRED_COLUMNS = ('username', 'group', 'course')
+
+MAX_LENGTHS = {
+    'username': User._meta.get_field('username').max_length,
+    'first_name': User._meta.get_field('first_name').max_length,
+    'last_name': User._meta.get_field('last_name').max_length,
+    'group': StudyGroup._meta.get_field('name').max_length,
+    'course': Course._meta.get_field('name').max_length,
+}
+
+PROGRESS_INTERVAL = 10000
+MAX_ERRORS = 100
+
+STAGING_TABLE = 'study_roster_import'
+
+
+class RosterError(ValueError):
+    pass
+
+
+class CopySource(io.RawIOBase):
+    def __init__(self, rows):
+        self.rows = rows
+        self.buffer = b''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.rows, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def clean_row(row):
+    row = {column: (row.get(column) or '').strip() for column in COLUMNS}
+    errors = []
+
+    for column in REQUIRED_COLUMNS:
+        if not row[column]:
+            errors.append(f'{column} is required')
+
+    for column, max_length in MAX_LENGTHS.items():
+        if len(row[column]) > max_length:
+            errors.append(f'{column} is longer than {max_length} characters')
+
+    row['gender'] = row['gender'].upper() or Gender.MALE
+    if row['gender'] not in Gender.values:
+        errors.append(f'"{row["gender"]}" is not a valid gender')
+
+    return row, errors
+
+
+def encode_rows(reader, result, progress):
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    for row in reader:
+        result['rows'] += 1
+        row, errors = clean_row(row)
+        if errors:
+            result['skipped'] += 1
+            if len(result['errors']) < MAX_ERRORS:
+                result['errors'].append({'line': reader.line_num, 'errors': errors})
+        else:
+            writer.writerow((reader.line_num, *(row[column] for column in COLUMNS)))
+            if out.tell() >= 65536:
+                yield out.getvalue().encode()
+                out.seek(0)
+                out.truncate()
+
+        if progress and result['rows'] % PROGRESS_INTERVAL == 0:
+            progress(result['rows'])
+
+    yield out.getvalue().encode()
+
+
+def import_roster(f, progress=None):
+    if connection.vendor != 'postgresql':
+        raise ImproperlyConfigured('Roster import requires PostgreSQL')
+
+    reader = csv.DictReader(f)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise RosterError(f'CSV file is missing required columns: {", ".join(missing)}')
+
+    result = {
+        'rows': 0, 'skipped': 0, 'errors': [],
+        'courses_created': 0, 'groups_created': 0,
+        'users_created': 0, 'users_updated': 0,
+        'students_created': 0, 'students_updated': 0,
+    }
+    tables = {
+        'staging': STAGING_TABLE,
+        'user': User._meta.db_table,
+        'student': Student._meta.db_table,
+        'group': StudyGroup._meta.db_table,
+        'course': Course._meta.db_table,
+    }
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('''
+            CREATE TEMP TABLE {staging} (
+                line integer NOT NULL,
+                username text NOT NULL,
+                first_name text,
+                last_name text,
+                gender text NOT NULL,
+                group_name text NOT NULL,
+                course_name text NOT NULL
+            ) ON COMMIT DROP
+        '''.format(**tables))
+        cursor.copy_expert(
+            'COPY {staging} FROM STDIN WITH (FORMAT csv)'.format(**tables),
+            CopySource(encode_rows(reader, result, progress)),
+        )
+        if progress:
+            progress(result['rows'])
+
+        cursor.execute('''
+            DELETE FROM {staging} a USING {staging} b
+            WHERE a.username = b.username AND a.line < b.line
+        '''.format(**tables))
+
+        # Rows for admins, tutors and other accounts that aren't students are
+        # reported instead of renaming those users and enrolling them.
+        cursor.execute('''
+            DELETE FROM {staging} s USING {user} u
+            WHERE u.username = s.username AND u.role IS DISTINCT FROM %s
+            RETURNING s.line, s.username
+        '''.format(**tables), [Role.STUDENT])
+        for line, username in sorted(cursor.fetchall()):
+            result['skipped'] += 1
+            if len(result['errors']) < MAX_ERRORS:
+                result['errors'].append({'line': line, 'errors': [f'"{username}" is not a student']})
+
+        cursor.execute('ANALYZE {staging}'.format(**tables))
+
+        cursor.execute('''
+            INSERT INTO {course} (name, updated_at)
+            SELECT DISTINCT s.course_name, now() FROM {staging} s
+            WHERE NOT EXISTS (SELECT 1 FROM {course} c WHERE c.name = s.course_name)
+        '''.format(**tables))
+        result['courses_created'] = cursor.rowcount
+
+        cursor.execute('''
+            CREATE TEMP TABLE {staging}_groups ON COMMIT DROP AS
+            SELECT DISTINCT s.group_name, c.id AS course_id
+            FROM {staging} s
+            JOIN (SELECT name, min(id) AS id FROM {course} GROUP BY name) c ON c.name = s.course_name
+        '''.format(**tables))
+        cursor.execute('''
+            INSERT INTO {group} (name, course_id, updated_at)
+            SELECT sg.group_name, sg.course_id, now() FROM {staging}_groups sg
+            WHERE NOT EXISTS (SELECT 1 FROM {group} g WHERE g.name = sg.group_name AND g.course_id = sg.course_id)
+        '''.format(**tables))
+        result['groups_created'] = cursor.rowcount
+
+        cursor.execute('''
+            INSERT INTO {user} (username, first_name, last_name, email, password, role,
+                                is_superuser, is_staff, is_active, date_joined)
+            SELECT username, coalesce(first_name, ''), coalesce(last_name, ''), '',
+                   '!' || md5(random()::text || line), %s, false, false, true, now()
+            FROM {staging}
+            ON CONFLICT (username) DO UPDATE
+            SET first_name = EXCLUDED.first_name, last_name = EXCLUDED.last_name
+            WHERE {user}.role = %s
+                AND ({user}.first_name, {user}.last_name) IS DISTINCT FROM (EXCLUDED.first_name, EXCLUDED.last_name)
+            RETURNING id, xmax = 0
+        '''.format(**tables), [Role.STUDENT, Role.STUDENT])
+        created_users = []
+        while rows := cursor.fetchmany(PROGRESS_INTERVAL):
+            for user_id, inserted in rows:
+                if inserted:
+                    created_users.append(user_id)
+                else:
+                    result['users_updated'] += 1
+        result['users_created'] = len(created_users)
+        create_tokens(created_users)
+
+        cursor.execute('''
+            SELECT DISTINCT st.study_group_id FROM {student} st
+            JOIN {user} u ON u.id = st.user_id
+            JOIN {staging} s ON s.username = u.username
+            WHERE st.study_group_id IS NOT NULL
+        '''.format(**tables))
+        group_ids = {row[0] for row in cursor.fetchall()}
+
+        cursor.execute('''
+            INSERT INTO {student} (user_id, gender, study_group_id, updated_at)
+            SELECT u.id, s.gender, g.id, now()
+            FROM {staging} s
+            JOIN {user} u ON u.username = s.username AND u.role = %s
+            JOIN (SELECT name, min(id) AS id FROM {course} GROUP BY name) c ON c.name = s.course_name
+            JOIN (SELECT name, course_id, min(id) AS id FROM {group} GROUP BY name, course_id) g
+                ON g.name = s.group_name AND g.course_id = c.id
+            ON CONFLICT (user_id) DO UPDATE
+            SET gender = EXCLUDED.gender, study_group_id = EXCLUDED.study_group_id, updated_at = EXCLUDED.updated_at
+            WHERE ({student}.gender, {student}.study_group_id) IS DISTINCT FROM (EXCLUDED.gender, EXCLUDED.study_group_id)
+            RETURNING study_group_id, xmax = 0
+        '''.format(**tables), [Role.STUDENT])
+        while rows := cursor.fetchmany(PROGRESS_INTERVAL):
+            for group_id, inserted in rows:
+                group_ids.add(group_id)
+                result['students_created' if inserted else 'students_updated'] += 1
+
+        if group_ids:
+            refresh_group_stats(group_ids)
+            refresh_course_stats(StudyGroup.objects.filter(id__in=group_ids).values('course_id'))
+
+        changed = [
+            model for model, changed in (
+                (Course, result['courses_created']),
+                (StudyGroup, result['groups_created']),
+                (User, result['users_created'] or result['users_updated']),
+                (Student, result['students_created'] or result['students_updated']),
+            ) if changed
+        ]
+        if changed:
+            bump_versions(*changed)
+
+    return result
@@ -0,0 +1,133 @@
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .metrics import make_metric
+
+
+REPLICA_LAG = make_metric(
+    'Gauge', 'db_replica_lag_seconds', 'Replication lag seen by the last check, -1 if the check failed', ('alias', ),
+    multiprocess_mode='max',
+)
+
+# A standby whose WAL receiver isn't streaming has received and replayed
+# everything it knows about, but may be arbitrarily far behind; it reports
+# NULL and is treated like an unreachable one.
+LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+
+class ReplicaReads:
+    def __init__(self):
+        self.alias = None
+
+    def get_alias(self):
+        # The database is chosen once per context, so version stamps and
+        # watermarks come from the same replica as the data they describe.
+        if self.alias is None:
+            self.alias = choose_replica() or DEFAULT_DB_ALIAS
+        return self.alias
+
+
+use_replica = ContextVar('use_replica', default=None)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = use_replica.set(ReplicaReads() if enabled else None)
+    try:
+        yield
+    finally:
+        use_replica.reset(token)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class LagMonitor:
+    def __init__(self):
+        self.checked = {}
+        self.lock = threading.Lock()
+
+    def get_interval(self):
+        return getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 1)
+
+    def get_max_lag(self):
+        return getattr(settings, 'REPLICA_MAX_LAG', 2)
+
+    def lag(self, alias):
+        with self.lock:
+            checked = self.checked.get(alias)
+        if checked is not None and monotonic() - checked[0] < self.get_interval():
+            return checked[1]
+
+        lag = self.check(alias)
+        with self.lock:
+            self.checked[alias] = (monotonic(), lag)
+        REPLICA_LAG.labels(alias).set(-1 if lag is None else lag)
+        return lag
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = cursor.fetchone()[0]
+        except DatabaseError:
+            return None
+        return None if lag is None else float(lag)
+
+    def is_healthy(self, alias):
+        lag = self.lag(alias)
+        return lag is not None and lag <= self.get_max_lag()
+
+    def clear(self):
+        with self.lock:
+            self.checked.clear()
+
+
+lag_monitor = LagMonitor()
+
+
+def choose_replica():
+    replicas = [alias for alias in get_replicas() if lag_monitor.is_healthy(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    app_labels = {'study'}
+
+    def db_for_read(self, model, **hints):
+        reads = use_replica.get()
+        if model._meta.app_label not in self.app_labels or reads is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return reads.get_alias()
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in self.app_labels:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
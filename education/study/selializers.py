@@ -1,16 +1,47 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
+from .fieldsets import serializer_path
 from .models import User, Tutor, Student, StudyGroup, Subject, Course, Report
 
 
-class UserSerializer(ModelSerializer):
+class DynamicFieldsMixin:
+    # Field of the model that identifies a collapsed instance instead of its pk.
+    collapsed_field = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        shape = self.context.get('shape')
+        if shape is None:
+            return fields
+
+        path = serializer_path(self)
+        requested = shape['fields'].get(path)
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested}
+
+        for name, field in fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if isinstance(nested, serializers.BaseSerializer) and path + (name, ) not in shape['expand']:
+                collapsed_field = getattr(nested, 'collapsed_field', None)
+                if collapsed_field is not None:
+                    fields[name] = serializers.SlugRelatedField(read_only=True, many=many, source=field.source, slug_field=collapsed_field)
+                else:
+                    fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, source=field.source)
+
+        return fields
+
+
+class UserSerializer(DynamicFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'first_name', 'last_name')
 
 
-class TutorReadSerializer(ModelSerializer):
+class TutorReadSerializer(DynamicFieldsMixin, ModelSerializer):
+    # Tutors are looked up and filtered by their user id everywhere else.
+    collapsed_field = 'user_id'
     user = UserSerializer()
     class Meta:
         model = Tutor
@@ -23,13 +54,13 @@ class TutorWriteSerializer(ModelSerializer):
         fields = ('user', )
 
 
-class SubjectSerializer(ModelSerializer):
+class SubjectSerializer(DynamicFieldsMixin, ModelSerializer):
     class Meta: 
         model = Subject
-        fields = '__all__'
+        fields = ('id', 'name')
 
 
-class CourseSerializer(ModelSerializer):
+class CourseSerializer(DynamicFieldsMixin, ModelSerializer):
     tutor = TutorReadSerializer()
     subjects = SubjectSerializer(many=True)
     class Meta: 
@@ -37,14 +68,14 @@ class CourseSerializer(ModelSerializer):
         fields = ('id', 'name', 'tutor', 'subjects')
 
 
-class StudyGroupSerializer(ModelSerializer):
+class StudyGroupSerializer(DynamicFieldsMixin, ModelSerializer):
     course = CourseSerializer()
     class Meta:
         model = StudyGroup
         fields = ('name', 'course')
 
 
-class StudentReadSerializer(ModelSerializer):
+class StudentReadSerializer(DynamicFieldsMixin, ModelSerializer):
     user = UserSerializer()
     study_group = StudyGroupSerializer()
     class Meta:
@@ -58,9 +89,9 @@ class StudentWriteSerializer(ModelSerializer):
         fields = ('user', 'gender', 'study_group')
 
 
-class ReportSerializer(ModelSerializer):
+class ReportSerializer(DynamicFieldsMixin, ModelSerializer):
     created_at = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%S")
 
     class Meta:
         model = Report
-        fields = '__all__'
+        fields = ('id', 'type', 'status', 'format', 'created_at', 'file')
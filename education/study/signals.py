@@ -0,0 +1,162 @@
+from collections import Counter
+
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import User, Tutor, Student, StudyGroup, Course, Subject, Report, StudyGroupStats, CourseStats
+from .stats import update_student_stats, update_course_stats, refresh_course_stats
+from .versions import bump_versions
+
+
+VERSIONED_MODELS = (User, Tutor, Student, StudyGroup, Course, Subject, Report)
+
+AUTH_FIELDS = ('role', 'is_active', 'is_staff', 'is_superuser')
+
+DELETE_TOUCHES = {
+    Tutor: (Course, ),
+    StudyGroup: (Student, ),
+    Subject: (Course, ),
+}
+
+
+def student_stats_key(instance):
+    return (instance.__dict__.get('study_group_id'), instance.__dict__.get('gender'))
+
+
+@receiver(post_init, sender=Student)
+def remember_student_stats_key(sender, instance, **kwargs):
+    instance._stats_key = student_stats_key(instance)
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    previous = None if created else instance._stats_key
+    current = student_stats_key(instance)
+    instance._stats_key = current
+
+    if previous == current:
+        return
+    deltas = Counter({current: 1})
+    if previous is not None:
+        deltas[previous] -= 1
+    update_student_stats(deltas)
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    update_student_stats(Counter({student_stats_key(instance): -1}))
+
+
+@receiver(post_init, sender=StudyGroup)
+def remember_study_group_course(sender, instance, **kwargs):
+    instance._stats_course_id = instance.__dict__.get('course_id')
+
+
+@receiver(post_save, sender=StudyGroup)
+def study_group_saved(sender, instance, created, **kwargs):
+    if created:
+        StudyGroupStats.objects.create(study_group=instance)
+        update_course_stats(instance.course_id, groups_count=1)
+    elif instance._stats_course_id != instance.course_id:
+        students_count = StudyGroupStats.objects.filter(study_group=instance).values_list('students_count', flat=True).first() or 0
+        update_course_stats(instance._stats_course_id, groups_count=-1, students_count=-students_count)
+        update_course_stats(instance.course_id, groups_count=1, students_count=students_count)
+
+    instance._stats_course_id = instance.course_id
+
+
+@receiver(pre_delete, sender=StudyGroup)
+def study_group_deleted(sender, instance, **kwargs):
+    students_count = StudyGroupStats.objects.filter(study_group=instance).values_list('students_count', flat=True).first() or 0
+    update_course_stats(instance.course_id, groups_count=-1, students_count=-students_count)
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    if created:
+        CourseStats.objects.create(course=instance)
+
+
+@receiver(m2m_changed, sender=Course.subjects.through)
+def course_subjects_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        if not reverse:
+            update_course_stats(instance.pk, subjects_count=len(pk_set))
+        else:
+            for course_id in pk_set:
+                update_course_stats(course_id, subjects_count=1)
+    elif reverse and action == 'pre_clear':
+        instance._stats_course_ids = list(instance.course_subjects.values_list('id', flat=True))
+    elif action in ('post_remove', 'post_clear'):
+        if not reverse:
+            refresh_course_stats([instance.pk])
+        elif action == 'post_clear':
+            refresh_course_stats(instance._stats_course_ids)
+        else:
+            refresh_course_stats(pk_set)
+
+
+@receiver(pre_delete, sender=Subject)
+def remember_subject_courses(sender, instance, **kwargs):
+    instance._stats_course_ids = list(instance.course_subjects.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Subject)
+def subject_deleted(sender, instance, **kwargs):
+    refresh_course_stats(instance._stats_course_ids)
+
+
+def model_saved(sender, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_versions(sender)
+
+
+def model_deleted(sender, **kwargs):
+    bump_versions(sender, *DELETE_TOUCHES.get(sender, ()))
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(model_saved, sender=model, dispatch_uid=f'bump_version_{model._meta.label_lower}_save')
+    post_delete.connect(model_deleted, sender=model, dispatch_uid=f'bump_version_{model._meta.label_lower}_delete')
+
+
+@receiver(m2m_changed, sender=Course.subjects.through)
+def course_subjects_version(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        course_ids = [instance.pk]
+    elif action == 'post_clear':
+        course_ids = instance._stats_course_ids
+    else:
+        course_ids = pk_set
+    Course.objects.filter(id__in=course_ids).update(updated_at=timezone.now())
+    bump_versions(Course)
+
+
+def user_auth_state(instance):
+    return tuple(instance.__dict__.get(field) for field in AUTH_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_user_auth_state(sender, instance, **kwargs):
+    instance._auth_state = user_auth_state(instance)
+
+
+@receiver(post_save, sender=User)
+def user_auth_changed(sender, instance, created, **kwargs):
+    current = user_auth_state(instance)
+    if not created and instance._auth_state != current:
+        token_cache.delete(*Token.objects.filter(user=instance).values_list('key', flat=True))
+    instance._auth_state = current
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    token_cache.delete(instance.key)
@@ -0,0 +1,128 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Q
+
+from .models import Course, StudyGroup, Gender, StudyGroupStats, CourseStats
+from .versions import bump_versions
+
+
+GROUP_STATS_FIELDS = ('students_count', 'male_count', 'female_count')
+COURSE_STATS_FIELDS = ('groups_count', 'students_count', 'subjects_count')
+
+GENDER_FIELDS = {
+    Gender.MALE: 'male_count',
+    Gender.FEMALE: 'female_count',
+}
+
+
+def count_group_stats(group_ids=None):
+    queryset = StudyGroup.objects.all()
+    if group_ids is not None:
+        queryset = queryset.filter(id__in=group_ids)
+
+    rows = queryset.annotate(
+        students_count=Count('student'),
+        male_count=Count('student', filter=Q(student__gender=Gender.MALE)),
+        female_count=Count('student', filter=Q(student__gender=Gender.FEMALE)),
+    ).values_list('id', *GROUP_STATS_FIELDS)
+
+    return {row[0]: row[1:] for row in rows}
+
+
+def count_course_stats(course_ids=None):
+    queryset = Course.objects.all()
+    if course_ids is not None:
+        queryset = queryset.filter(id__in=course_ids)
+
+    groups = dict(queryset.annotate(value=Count('studygroup')).values_list('id', 'value'))
+    students = dict(queryset.annotate(value=Count('studygroup__student')).values_list('id', 'value'))
+    subjects = dict(queryset.annotate(value=Count('subjects')).values_list('id', 'value'))
+
+    return {course_id: (groups[course_id], students[course_id], subjects[course_id]) for course_id in groups}
+
+
+def save_group_stats(counts):
+    StudyGroupStats.objects.bulk_create(
+        [StudyGroupStats(study_group_id=group_id, **dict(zip(GROUP_STATS_FIELDS, values))) for group_id, values in counts.items()],
+        update_conflicts=True, unique_fields=['study_group'], update_fields=GROUP_STATS_FIELDS,
+    )
+
+
+def save_course_stats(counts):
+    CourseStats.objects.bulk_create(
+        [CourseStats(course_id=course_id, **dict(zip(COURSE_STATS_FIELDS, values))) for course_id, values in counts.items()],
+        update_conflicts=True, unique_fields=['course'], update_fields=COURSE_STATS_FIELDS,
+    )
+
+
+def refresh_group_stats(group_ids):
+    save_group_stats(count_group_stats(group_ids))
+
+
+def refresh_course_stats(course_ids):
+    save_course_stats(count_course_stats(course_ids))
+
+
+def update_student_stats(deltas):
+    changes = defaultdict(Counter)
+    for (group_id, gender), change in deltas.items():
+        if group_id is None or not change:
+            continue
+        changes[group_id]['students_count'] += change
+        changes[group_id][GENDER_FIELDS[gender]] += change
+
+    for group_id, fields in changes.items():
+        fields = {field: change for field, change in fields.items() if change}
+        if not fields:
+            continue
+
+        updated = StudyGroupStats.objects.filter(study_group_id=group_id).update(
+            **{field: F(field) + change for field, change in fields.items()}
+        )
+        if not updated:
+            refresh_group_stats([group_id])
+            refresh_course_stats(StudyGroup.objects.filter(id=group_id).values('course_id'))
+            continue
+
+        if fields.get('students_count'):
+            CourseStats.objects.filter(course__studygroup=group_id).update(
+                students_count=F('students_count') + fields['students_count']
+            )
+
+
+def update_course_stats(course_id, **changes):
+    changes = {field: change for field, change in changes.items() if change}
+    if not changes or course_id is None:
+        return
+
+    updated = CourseStats.objects.filter(course_id=course_id).update(
+        **{field: F(field) + change for field, change in changes.items()}
+    )
+    if not updated:
+        refresh_course_stats([course_id])
+
+
+def rebuild_stats(dry_run=False):
+    drift = []
+
+    group_counts = count_group_stats()
+    stored = {row[0]: row[1:] for row in StudyGroupStats.objects.values_list('study_group_id', *GROUP_STATS_FIELDS)}
+    for group_id, values in group_counts.items():
+        if stored.get(group_id) != values:
+            drift.append(('study_group', group_id, stored.get(group_id), values))
+
+    course_counts = count_course_stats()
+    stored = {row[0]: row[1:] for row in CourseStats.objects.values_list('course_id', *COURSE_STATS_FIELDS)}
+    for course_id, values in course_counts.items():
+        if stored.get(course_id) != values:
+            drift.append(('course', course_id, stored.get(course_id), values))
+
+    if not dry_run:
+        save_group_stats(group_counts)
+        save_course_stats(course_counts)
+        # Reports read the counts through their groups and courses, so a
+        # repair has to change the watermark of reports built from them.
+        if drift:
+            bump_versions(StudyGroup, Course)
+
+    return drift
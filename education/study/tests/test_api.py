@@ -1,13 +1,17 @@
 import json
 from datetime import datetime
+from unittest import mock
 from django.urls import reverse
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, Report, ReportType, Status
+from study import bulk
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, Report, ReportType, Status, StudyGroupStats, CourseStats
 from study.selializers import UserSerializer, TutorReadSerializer, SubjectSerializer,\
-                            CourseSerializer, StudyGroupSerializer, StudentReadSerializer, ReportSerializer
+                            CourseSerializer, StudyGroupSerializer, StudentReadSerializer, StudentWriteSerializer, ReportSerializer
 
 
 class UsersApiTestCase(APITestCase):
@@ -20,7 +24,7 @@ class UsersApiTestCase(APITestCase):
         response = self.client.get(url)
         serializer_data = UserSerializer([self.user_owner, self.user_not_owner], many=True).data
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         url = reverse('user-detail', args=(self.user_owner.id,))
@@ -104,7 +108,7 @@ class TutorApiTestCase(APITestCase):
         serializer_data = TutorReadSerializer([tutor], many=True).data
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         tutor = Tutor.objects.create(user_id=self.user_tutor.id)
@@ -186,7 +190,7 @@ class StudentApiTestCase(APITestCase):
         serializer_data = StudentReadSerializer([student], many=True).data
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         student = Student.objects.create(user_id=self.user_student.id, gender=Gender.MALE, study_group_id=self.study_group.id)
@@ -281,7 +285,7 @@ class SubjectApiTestCase(APITestCase):
         serializer_data = SubjectSerializer(subjects, many=True).data
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         url = reverse('subject-detail', args=(self.subject1.id,))
@@ -367,7 +371,7 @@ class CourseApiTestCase(APITestCase):
         serializer_data = CourseSerializer([self.course], many=True).data
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         url = reverse('course-detail', args=(self.course.id,))
@@ -410,6 +414,39 @@ class CourseApiTestCase(APITestCase):
         self.assertEqual(status.HTTP_201_CREATED, response.status_code)
         self.assertEqual(2, Course.objects.all().count())
 
+        course = Course.objects.exclude(id=self.course.id).get()
+        self.assertEqual(CourseSerializer(course).data, response.data)
+        self.assertEqual({self.subject1.id, self.subject2.id}, set(course.subjects.values_list('id', flat=True)))
+
+    def test_create_many_subjects(self):
+        subjects = Subject.objects.bulk_create(Subject(name=f'Subject {i}') for i in range(60))
+        data = {
+            'name': 'Учебный план',
+            'tutor': {'user': {'id': self.user_tutor.id}},
+            'subjects': [{'id': subject.id} for subject in subjects],
+        }
+        self.client.force_login(self.user_admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('course-list'), data=json.dumps(data), content_type='application/json')
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(60, len(response.data['subjects']))
+        self.assertLess(len(queries), 30)
+        self.assertEqual(60, CourseStats.objects.get(course_id=response.data['id']).subjects_count)
+
+    def test_create_missing_subjects(self):
+        data = {
+            'name': 'Учебный план',
+            'tutor': {'user': {'id': self.user_tutor.id}},
+            'subjects': [{'id': self.subject1.id}, {'id': 0}, {'id': -1}],
+        }
+        self.client.force_login(self.user_admin)
+        response = self.client.post(reverse('course-list'), data=json.dumps(data), content_type='application/json')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(['0', '-1'], response.data['subjects'])
+        self.assertEqual(1, Course.objects.all().count())
+
     def test_update(self):
         url = reverse('course-detail', args=(self.course.id,))
         data = {
@@ -489,7 +526,7 @@ class StudyGroupApiTestCase(APITestCase):
         response = self.client.get(url)
         serializer_data = StudyGroupSerializer([self.study_group], many=True).data
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         url = reverse('studygroup-detail', args=(self.study_group.id,))
@@ -610,7 +647,7 @@ class ReportApiTestCase(APITestCase):
         response = self.client.get(url)
         serializer_data = ReportSerializer([self.report], many=True).data
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer_data, response.data)
+        self.assertEqual(serializer_data, response.data['results'])
 
     def test_get_item(self):
         url = reverse('report-detail', args=(self.report.id,))
@@ -683,4 +720,101 @@ class ReportApiTestCase(APITestCase):
             if method == 'delete':
                 url = url = reverse('report-detail', args=(self.report.id,))
                 response = self.client.delete(url)
-            self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
\ No newline at end of file
+            self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+
+class StudentBulkApiTestCase(APITestCase):
+    def setUp(self):
+        self.user_tutor = User.objects.create(username='user1', password='user1', first_name='Ivan', last_name='Sidorov', role=Role.TUTOR)
+        self.course = Course.objects.create(name='Психология')
+        self.study_group = StudyGroup.objects.create(name='q-2', course_id=self.course.id)
+        self.users = User.objects.bulk_create(
+            User(username=f'student{i}', first_name='Ivan', last_name=f'Petrov{i}', role=Role.STUDENT) for i in range(100)
+        )
+        self.client.force_login(self.user_tutor)
+
+    def post(self, data):
+        return self.client.post(reverse('student-list'), data=json.dumps(data), content_type='application/json')
+
+    def test_create(self):
+        data = [{'user': user.id, 'gender': 'FEMALE', 'study_group': self.study_group.id} for user in self.users]
+        response = self.post(data)
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(100, len(response.data['created']))
+        self.assertEqual(100, Student.objects.filter(study_group=self.study_group, gender=Gender.FEMALE).count())
+        stats = StudyGroupStats.objects.get(study_group=self.study_group)
+        self.assertEqual(100, stats.students_count)
+        self.assertEqual(100, stats.female_count)
+
+    def test_constant_queries(self):
+        response = self.post([{'user': user.id} for user in self.users[:10]])
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+
+        students = list(Student.objects.order_by('id'))
+        data = [{'id': student.id, 'study_group': self.study_group.id} for student in students]
+        data += [{'user': user.id, 'study_group': self.study_group.id} for user in self.users[10:]]
+        with self.assertNumQueries(17):
+            response = self.post(data)
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(10, len(response.data['updated']))
+        self.assertEqual(90, len(response.data['created']))
+        self.assertEqual(100, Student.objects.filter(study_group=self.study_group).count())
+
+    def test_item_errors(self):
+        Student.objects.create(user_id=self.users[0].id)
+        data = [
+            {'user': self.users[1].id, 'study_group': self.study_group.id},
+            {'user': self.users[0].id},
+            {'user': 100500},
+            {'user': self.users[2].id, 'gender': 'OTHER', 'study_group': 100500},
+            {'user': self.users[1].id},
+            {'id': 100500, 'gender': 'MALE'},
+            'garbage',
+        ]
+        response = self.post(data)
+
+        self.assertEqual(status.HTTP_207_MULTI_STATUS, response.status_code)
+        self.assertEqual(1, len(response.data['created']))
+        errors = {error['index']: set(error['errors']) for error in response.data['errors']}
+        self.assertEqual({1: {'user'}, 2: {'user'}, 3: {'gender', 'study_group'}, 4: {'user'}, 5: {'id', 'user'}, 6: {'non_field_errors'}}, errors)
+        self.assertEqual(2, Student.objects.count())
+
+    def test_serializer_messages(self):
+        data = [{'user': 100500}, {'user': 'abc'}, {'gender': 'OTHER'}]
+        response = self.post(data)
+
+        expected = [StudentWriteSerializer(data=item) for item in data]
+        for serializer in expected:
+            serializer.is_valid()
+        self.assertEqual([serializer.errors for serializer in expected], [error['errors'] for error in response.data['errors']])
+
+    def test_concurrent_insert(self):
+        validate_items = bulk.validate_items
+
+        def validate_then_insert(*args):
+            result = validate_items(*args)
+            Student.objects.create(user=self.users[1], gender=Gender.FEMALE, study_group=self.study_group)
+            return result
+
+        data = [{'user': user.id, 'study_group': self.study_group.id} for user in self.users[:3]]
+        with mock.patch.object(bulk, 'validate_items', side_effect=validate_then_insert):
+            response = self.post(data)
+
+        self.assertEqual(status.HTTP_207_MULTI_STATUS, response.status_code)
+        self.assertEqual(2, len(response.data['created']))
+        serializer = StudentWriteSerializer(data={'user': self.users[1].id})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual([{'index': 1, 'errors': serializer.errors}], response.data['errors'])
+        self.assertEqual(3, Student.objects.count())
+        # Two rows from the fallback and the concurrent insert, each counted once.
+        group_stats = StudyGroupStats.objects.get(study_group=self.study_group)
+        self.assertEqual((3, 2, 1), (group_stats.students_count, group_stats.male_count, group_stats.female_count))
+        self.assertEqual(3, CourseStats.objects.get(course=self.course).students_count)
+
+    def test_all_invalid(self):
+        response = self.post([{'user': 100500}])
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(0, Student.objects.count())
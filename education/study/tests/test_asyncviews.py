@@ -0,0 +1,127 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from study.filters import trigram_support
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender
+
+
+@override_settings(ROOT_URLCONF='study.tests.urls_async')
+class AsyncViewsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        tutor_user = User.objects.create(username='tutor1', first_name='Ivan', last_name='Petrov', role=Role.TUTOR)
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.subjects = [Subject.objects.create(name=f'Subject {i}') for i in range(2)]
+        self.course = Course.objects.create(name='Психология', tutor=self.tutor)
+        self.course.subjects.add(*self.subjects)
+        self.group = StudyGroup.objects.create(name='g-1', course=self.course)
+        self.students = []
+        for i in range(3):
+            user = User.objects.create(username=f'student{i}', first_name=f'Anna{i}', last_name='Ivanova', role=Role.STUDENT)
+            self.students.append(Student.objects.create(user=user, gender=Gender.FEMALE, study_group=self.group))
+
+    def test_routes(self):
+        self.assertTrue(iscoroutinefunction(resolve(reverse('student-list')).func))
+        self.assertTrue(iscoroutinefunction(resolve(reverse('course-detail', args=(self.course.id, ))).func))
+        self.assertFalse(iscoroutinefunction(resolve(reverse('user-list')).func))
+
+    async def test_list_matches_sync(self):
+        for basename in ('student', 'course', 'subject', 'studygroup'):
+            for params in ({}, {'page_size': 1}, {'fields': 'id'}, {'expand': 'course'}, {'expand': 'study_group.course'}):
+                url = reverse(f'{basename}-list')
+                cache.clear()
+                expected = await self.sync_get(url, params)
+                cache.clear()
+                response = await self.async_client.get(url, params)
+                self.assertEqual(status.HTTP_200_OK, response.status_code)
+                self.assertEqual(expected.content, response.content, (basename, params))
+                self.assertEqual(expected['ETag'], response['ETag'])
+
+    async def test_retrieve_matches_sync(self):
+        for basename, pk in (('student', self.students[0].id), ('course', self.course.id),
+                             ('subject', self.subjects[0].id), ('studygroup', self.group.id)):
+            url = reverse(f'{basename}-detail', args=(pk, ))
+            expected = await self.sync_get(url)
+            response = await self.async_client.get(url)
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            self.assertEqual(expected.content, response.content, basename)
+
+    async def test_search(self):
+        trigram_support.clear()
+        response = await self.async_client.get(reverse('student-list'), {'search': 'anna1', 'gender': Gender.FEMALE})
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([self.students[1].user_id], [item['user']['id'] for item in response.json()['results']])
+
+    async def test_not_found(self):
+        response = await self.async_client.get(reverse('student-detail', args=(0, )))
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+        response = await self.async_client.get(reverse('student-detail', args=('abc', )))
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    async def test_pagination(self):
+        response = await self.async_client.get(reverse('student-list'), {'page_size': 2})
+        data = response.json()
+        self.assertEqual([student.user_id for student in self.students[:2]], [item['user']['id'] for item in data['results']])
+
+        response = await self.async_client.get(data['next'])
+        self.assertEqual([self.students[2].user_id], [item['user']['id'] for item in response.json()['results']])
+
+    async def test_not_modified(self):
+        url = reverse('course-list')
+        response = await self.async_client.get(url)
+
+        response = await self.async_client.get(url, if_none_match=response['ETag'])
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+    def test_cached(self):
+        url = reverse('course-list')
+        expected = self.client.get(url).content
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(expected, response.content)
+
+    def test_cache_shared_with_sync(self):
+        url = reverse('course-list')
+        with override_settings(ROOT_URLCONF='education.urls'):
+            expected = self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(expected.content, response.content)
+        self.assertEqual(expected['ETag'], response['ETag'])
+
+    def test_queries(self):
+        for basename, queries in (('student', 3), ('studygroup', 3)):
+            with self.assertNumQueries(queries):
+                response = self.client.get(reverse(f'{basename}-list'))
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    async def test_write_falls_back_to_sync(self):
+        admin = await User.objects.acreate(username='admin', role=Role.ADMIN)
+        token = await Token.objects.aget(user=admin)
+
+        response = await self.async_client.post(reverse('subject-list'), {'name': 'Логика'}, content_type='application/json')
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+        response = await self.async_client.post(
+            reverse('subject-list'), {'name': 'Логика'}, content_type='application/json',
+            authorization=f'Token {token.key}',
+        )
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertTrue(await Subject.objects.filter(name='Логика').aexists())
+
+    async def test_authentication(self):
+        response = await self.async_client.get(reverse('student-list'), authorization='Token invalid')
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+    async def sync_get(self, url, params=None):
+        with override_settings(ROOT_URLCONF='education.urls'):
+            return await sync_to_async(self.client.get)(url, params)
@@ -0,0 +1,128 @@
+import base64
+from unittest import mock
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from study.api.v1.courses import ReportViewSet
+from study.authentication import CachedBasicAuthentication, token_cache, credential_cache
+from study.models import User, Role, Report
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='admin', role=Role.ADMIN)
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('report-list')
+
+    def post(self):
+        return self.client.post(self.url, {'type': 'course_report', 'created_at': '2024-01-01T00:00:00'})
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user-detail', args=(self.user.id,)))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        return [query for query in queries if 'authtoken_token' in query['sql']]
+
+    def test_cached(self):
+        self.assertEqual(1, len(self.token_queries()))
+        self.assertEqual(0, len(self.token_queries()))
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, self.post().status_code)
+
+    def test_role_change(self):
+        self.assertEqual(status.HTTP_201_CREATED, self.post().status_code)
+        self.user.role = Role.STUDENT
+        self.user.save()
+        self.assertEqual(status.HTTP_403_FORBIDDEN, self.post().status_code)
+
+    def test_deactivated(self):
+        self.token_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, self.post().status_code)
+
+    def test_unrelated_change_keeps_cache(self):
+        self.token_queries()
+        self.user.first_name = 'Ivan'
+        self.user.save()
+        self.assertEqual(0, len(self.token_queries()))
+
+    def test_cached_fields(self):
+        self.token_queries()
+
+        values = token_cache.get(self.token.key)
+        self.assertEqual({'id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser'}, set(values))
+        self.assertNotIn('password', values)
+
+    def test_token_deleted(self):
+        self.token_queries()
+        self.token.delete()
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, self.post().status_code)
+
+    @override_settings(
+        CACHES={'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth-test'}},
+        AUTH_CACHE_ALIAS='auth',
+    )
+    def test_shared_cache(self):
+        self.token_queries()
+        token_cache.clear()
+        self.assertEqual(0, len(self.token_queries()))
+
+        key = self.token.key
+        self.token.delete()
+        self.assertIsNone(caches['auth'].get(token_cache.make_key(key)))
+
+
+class CachedBasicAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        credential_cache.clear()
+        patcher = mock.patch.object(ReportViewSet, 'authentication_classes', [CachedBasicAuthentication])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='admin', password='secret', role=Role.ADMIN)
+        self.url = reverse('report-list')
+
+    def post(self, password='secret'):
+        self.client.credentials(HTTP_AUTHORIZATION='Basic ' + base64.b64encode(f'admin:{password}'.encode()).decode())
+        return self.client.post(self.url, {'type': 'course_report', 'created_at': '2024-01-01T00:00:00'})
+
+    def test_cached(self):
+        with mock.patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.verify', wraps=PBKDF2PasswordHasher().verify) as verify:
+            self.assertEqual(status.HTTP_201_CREATED, self.post().status_code)
+            Report.objects.all().delete()
+            self.assertEqual(status.HTTP_201_CREATED, self.post().status_code)
+        self.assertEqual(1, verify.call_count)
+
+    def test_key_is_not_plaintext(self):
+        self.post()
+        self.assertFalse(any('secret' in key for key in credential_cache.local.entries))
+
+    def test_wrong_password(self):
+        self.post()
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, self.post('wrong').status_code)
+
+    def test_password_change(self):
+        self.post()
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, self.post().status_code)
+        Report.objects.all().delete()
+        self.assertEqual(status.HTTP_201_CREATED, self.post('changed').status_code)
+
+    def test_deactivated(self):
+        self.post()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, self.post().status_code)
@@ -0,0 +1,80 @@
+from django.test import TestCase
+
+from study.benchmarks import datasets
+from study.benchmarks.concurrency import run_concurrency, max_concurrency
+from study.benchmarks.plans import check_query_plans, find_seq_scans
+from study.benchmarks.runner import PAGE_SIZE, run_benchmarks, compare, slow_compiled
+from study.models import Student, StudyGroupStats
+
+
+class BenchmarkTestCase(TestCase):
+    def test_seed(self):
+        datasets.seed(60, batch_size=25)
+
+        self.assertEqual(60, Student.objects.count())
+        self.assertEqual(60, sum(StudyGroupStats.objects.values_list('students_count', flat=True)))
+
+    def test_run(self):
+        results = run_benchmarks([30], 2, datasets.seed, datasets.clear, cases=['list:student', 'serialize:', 'compiled:'], log=lambda line: None)
+
+        cases = results['results']['30']
+        self.assertIn('list:student', cases)
+        self.assertIn('serialize:StudentReadSerializer', cases)
+        self.assertIn('compiled:StudentReadSerializer', cases)
+        self.assertNotIn('detail:student', cases)
+        self.assertEqual(3, cases['list:student']['queries'])
+        # Both serializer cases load their page.
+        self.assertEqual(cases['serialize:StudentReadSerializer']['queries'], cases['compiled:StudentReadSerializer']['queries'])
+        speedup = results['speedups']['30']['StudentReadSerializer']
+        self.assertEqual(30, speedup['rows'])
+        self.assertGreater(speedup['speedup'], 0)
+
+    def test_slow_compiled(self):
+        results = {'speedups': {'10': {'CourseSerializer': {'speedup': 1.5, 'rows': 1}}, '5000': {
+            'CourseSerializer': {'speedup': 2.5, 'rows': PAGE_SIZE},
+            'StudentReadSerializer': {'speedup': 7, 'rows': PAGE_SIZE},
+        }}}
+
+        self.assertEqual([('5000', 'CourseSerializer', 2.5)], slow_compiled(results, 3))
+
+    def test_compare(self):
+        baseline = {'results': {'10': {'list:student': {'p50_ms': 10, 'p99_ms': 20, 'queries': 2, 'peak_memory_kb': 100}}}}
+        results = {'results': {'10': {
+            'list:student': {'p50_ms': 11, 'p99_ms': 30, 'queries': 3, 'peak_memory_kb': 100},
+            'list:course': {'p50_ms': 1, 'p99_ms': 1, 'queries': 1, 'peak_memory_kb': 1},
+        }}}
+
+        regressions = compare(results, baseline, 0.2)
+
+        self.assertEqual({('10', 'list:student', 'queries', 2, 3), ('10', 'list:student', 'p99_ms', 20, 30)}, set(regressions))
+
+    def test_concurrency(self):
+        results = run_concurrency('/api/v1/subjects/', [1, 2], 4, 2)
+
+        for mode in ('wsgi', 'asgi'):
+            self.assertEqual({'1', '2'}, set(results[mode]))
+            self.assertEqual(4, results[mode]['2']['requests'])
+            self.assertEqual(0, results[mode]['2']['errors'])
+
+    def test_max_concurrency(self):
+        results = {'1': {'p99_ms': 5, 'errors': 0}, '4': {'p99_ms': 20, 'errors': 0}, '16': {'p99_ms': 90, 'errors': 0}}
+
+        self.assertEqual(4, max_concurrency(results, 50))
+        self.assertEqual(0, max_concurrency(results, 1))
+
+    def test_find_seq_scans(self):
+        plan = {'Node Type': 'Nested Loop', 'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'study_user', 'Actual Rows': 10, 'Rows Removed by Filter': 990, 'Actual Loops': 2},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'study_subject', 'Actual Rows': 200, 'Actual Loops': 1},
+            {'Node Type': 'Index Scan', 'Relation Name': 'study_student', 'Actual Rows': 5000, 'Actual Loops': 1},
+        ]}
+
+        self.assertEqual([('study_user', 2000)], find_seq_scans(plan, 1000))
+
+    def test_check_query_plans(self):
+        datasets.seed(60, batch_size=25)
+
+        self.assertEqual([], check_query_plans(100000, log=lambda line: None))
+
+        violations = check_query_plans(0, cases=['worker:'], log=lambda line: None)
+        self.assertEqual({('worker:claim', 'study_report'), ('worker:reuse', 'study_report')}, {violation[:2] for violation in violations})
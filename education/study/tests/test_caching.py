@@ -0,0 +1,150 @@
+import tempfile
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.models import User, Tutor, Subject, Course, StudyGroup, Role, ModelVersion
+
+
+class CachedResponseTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='tutor1', first_name='Ivan', last_name='Petrov', role=Role.TUTOR)
+        self.tutor = Tutor.objects.create(user=self.user)
+        self.subject = Subject.objects.create(name='Философия')
+        self.course = Course.objects.create(name='Психология', tutor=self.tutor)
+        self.course.subjects.add(self.subject)
+        self.url = reverse('course-list')
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        return response.data
+
+    def test_cached(self):
+        data = self.get()
+        with self.assertNumQueries(1):
+            self.assertEqual(data, self.get())
+
+    def test_detail_cached(self):
+        url = reverse('course-detail', args=(self.course.id,))
+        data = self.get(url)
+        with self.assertNumQueries(2):
+            self.assertEqual(data, self.get(url))
+
+    def test_query_params(self):
+        self.get()
+        with self.assertNumQueries(3):
+            self.get(page_size=1)
+
+    def test_role(self):
+        self.get()
+        self.client.force_authenticate(User.objects.create(username='admin', role=Role.ADMIN))
+        with self.assertNumQueries(3):
+            self.get()
+
+    def test_save_invalidates(self):
+        self.get()
+        self.course.name = 'Социология'
+        self.course.save()
+        self.assertEqual('Социология', self.get()['results'][0]['name'])
+
+    def test_subjects_change_invalidates(self):
+        self.get()
+        self.course.subjects.remove(self.subject)
+        self.assertEqual([], self.get()['results'][0]['subjects'])
+
+    def test_related_change_invalidates(self):
+        self.get()
+        self.user.first_name = 'Petr'
+        self.user.save()
+        self.assertEqual('Petr', self.get()['results'][0]['tutor']['user']['first_name'])
+
+    def test_delete_invalidates(self):
+        self.get(reverse('subject-list'))
+        self.subject.delete()
+        self.assertEqual([], self.get(reverse('subject-list'))['results'])
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmp}}):
+                data = self.get()
+                with self.assertNumQueries(1):
+                    self.assertEqual(data, self.get())
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.subject = Subject.objects.create(name='Философия')
+        self.course = Course.objects.create(name='Психология')
+        self.course.subjects.add(self.subject)
+        self.other = Course.objects.create(name='Социология')
+
+    def test_list_headers(self):
+        response = self.client.get(reverse('course-list'))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_if_none_match(self):
+        url = reverse('studygroup-list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+
+        StudyGroup.objects.create(name='g-1', course=self.course)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_if_modified_since(self):
+        url = reverse('subject-list')
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+        Subject.objects.filter(id=self.subject.id).update(name='Логика')
+        ModelVersion.objects.filter(label='study.subject').update(updated_at=timezone.now() + timedelta(seconds=5))
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_query_params_change_etag(self):
+        url = reverse('course-list')
+        self.assertNotEqual(self.client.get(url)['ETag'], self.client.get(url, {'page_size': 1})['ETag'])
+
+    def test_detail(self):
+        url = reverse('course-detail', args=(self.course.id,))
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(http_date(int(Course.objects.get(id=self.course.id).updated_at.timestamp())), response['Last-Modified'])
+
+        self.other.name = 'Логика'
+        self.other.save()
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        self.course.subjects.remove(self.subject)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([], response.data['subjects'])
+
+    def test_detail_related_change(self):
+        url = reverse('course-detail', args=(self.course.id,))
+        etag = self.client.get(url)['ETag']
+        self.subject.name = 'Логика'
+        self.subject.save()
+        self.assertEqual(status.HTTP_200_OK, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+    def test_not_found(self):
+        response = self.client.get(reverse('course-detail', args=(0,)))
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.fieldsets import parse_shape
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender
+
+
+class ParseShapeTestCase(TestCase):
+    def test_no_params(self):
+        self.assertIsNone(parse_shape(QueryDict('page_size=10')))
+
+    def test_parse(self):
+        shape = parse_shape(QueryDict('fields=id,study_group.name&expand=user,study_group.course.tutor'))
+        self.assertEqual({(): {'id', 'study_group'}, ('study_group', ): {'name'}}, shape['fields'])
+        self.assertEqual(
+            {('user', ), ('study_group', ), ('study_group', 'course'), ('study_group', 'course', 'tutor')},
+            shape['expand'],
+        )
+
+
+class FieldsetsApiTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        tutor_user = User.objects.create(username='tutor1', first_name='Ivan', last_name='Petrov', role=Role.TUTOR)
+        self.tutor = Tutor.objects.create(user=tutor_user)
+        self.subjects = [Subject.objects.create(name=f'Subject {i}') for i in range(2)]
+        self.course = Course.objects.create(name='Психология', tutor=self.tutor)
+        self.course.subjects.add(*self.subjects)
+        self.group = StudyGroup.objects.create(name='g-1', course=self.course)
+        for i in range(3):
+            user = User.objects.create(username=f'student{i}', first_name=f'Anna{i}', last_name='Ivanova', role=Role.STUDENT)
+            Student.objects.create(user=user, gender=Gender.FEMALE, study_group=self.group)
+
+    def get(self, basename, params, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse(f'{basename}-list'), params)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        return response.data['results']
+
+    def test_default_unchanged(self):
+        results = self.get('course', {}, 3)
+        self.assertEqual('Petrov', results[0]['tutor']['user']['last_name'])
+        self.assertEqual('Subject 0', results[0]['subjects'][0]['name'])
+
+    def test_collapsed(self):
+        results = self.get('course', {'fields': 'id,name,tutor,subjects'}, 3)
+        self.assertEqual(
+            [{'id': self.course.id, 'name': 'Психология', 'tutor': self.tutor.user_id, 'subjects': [subject.id for subject in self.subjects]}],
+            results,
+        )
+
+    def test_fields_only(self):
+        results = self.get('course', {'fields': 'id,name'}, 2)
+        self.assertEqual([{'id': self.course.id, 'name': 'Психология'}], results)
+
+    def test_expand(self):
+        results = self.get('course', {'expand': 'tutor'}, 3)
+        self.assertEqual({'user': self.tutor.user_id}, results[0]['tutor'])
+        self.assertEqual([subject.id for subject in self.subjects], results[0]['subjects'])
+
+    def test_student_names_only(self):
+        results = self.get('student', {'fields': 'user.id,user.first_name,study_group'}, 2)
+        self.assertEqual({'user': {'id': results[0]['user']['id'], 'first_name': 'Anna0'}, 'study_group': self.group.id}, results[0])
+
+    def test_student_nested_expand(self):
+        results = self.get('student', {'expand': 'study_group.course'}, 3)
+        course = results[0]['study_group']['course']
+        self.assertEqual(self.tutor.user_id, course['tutor'])
+        self.assertEqual([subject.id for subject in self.subjects], course['subjects'])
+        self.assertEqual(results[0]['user'], Student.objects.order_by('id').first().user_id)
+
+    def test_collapsed_queries(self):
+        # Collapsed tutors come with the select_related() join, not per row.
+        params = {'expand': 'course'}
+        results = self.get('studygroup', params, 3)
+        self.assertEqual(self.tutor.user_id, results[0]['course']['tutor'])
+
+        for i in range(5):
+            user = User.objects.create(username=f'tutor{i + 2}', role=Role.TUTOR)
+            course = Course.objects.create(name=f'Course {i}', tutor=Tutor.objects.create(user=user))
+            StudyGroup.objects.create(name=f'g-{i + 2}', course=course)
+
+        results = self.get('studygroup', params, 3)
+        self.assertEqual(6, len(results))
+
+    def test_detail(self):
+        response = self.client.get(reverse('studygroup-detail', args=(self.group.id,)), {'expand': 'course', 'fields': 'name,course.name'})
+        self.assertEqual({'name': 'g-1', 'course': {'name': 'Психология'}}, response.data)
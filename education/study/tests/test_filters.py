@@ -0,0 +1,99 @@
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.filters import has_trigram
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender
+
+
+class FiltersTestCase(APITestCase):
+    def setUp(self):
+        self.tutors = [
+            Tutor.objects.create(user=User.objects.create(username=f'tutor{i}', first_name='Anna', last_name=f'Tutor{i}', role=Role.TUTOR))
+            for i in range(2)
+        ]
+        self.subjects = [Subject.objects.create(name=name) for name in ('Алгебра', 'Физика')]
+        self.courses = [
+            Course.objects.create(name='Психология', tutor=self.tutors[0]),
+            Course.objects.create(name='Астрономия', tutor=self.tutors[1]),
+        ]
+        self.courses[0].subjects.add(*self.subjects)
+        self.courses[1].subjects.add(self.subjects[1])
+        self.groups = [
+            StudyGroup.objects.create(name='ПС-101', course=self.courses[0]),
+            StudyGroup.objects.create(name='АС-201', course=self.courses[1]),
+        ]
+        self.students = [
+            Student.objects.create(
+                user=User.objects.create(username=f'student{i}', first_name=first_name, last_name=last_name, role=Role.STUDENT),
+                gender=gender, study_group=self.groups[i % 2],
+            )
+            for i, (first_name, last_name, gender) in enumerate([
+                ('Ivan', 'Petrov', Gender.MALE),
+                ('Maria', 'Ivanova', Gender.FEMALE),
+                ('Petr', 'Sidorov', Gender.MALE),
+            ])
+        ]
+
+    def get_results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        return response.data['results']
+
+    def get_ids(self, url):
+        return [item['id'] for item in self.get_results(url)]
+
+    def get_user_ids(self, url):
+        return [item['user']['id'] for item in self.get_results(url)]
+
+    def student_ids(self, *indexes):
+        return [self.students[i].user.id for i in indexes]
+
+    def test_students(self):
+        url = reverse('student-list')
+
+        self.assertEqual(self.student_ids(0, 2), self.get_user_ids(f'{url}?study_group={self.groups[0].id}'))
+        self.assertEqual(self.student_ids(1), self.get_user_ids(f'{url}?course={self.courses[1].id}'))
+        self.assertEqual(self.student_ids(0, 2), self.get_user_ids(f'{url}?gender={Gender.MALE}'))
+        self.assertEqual(self.student_ids(1), self.get_user_ids(f'{url}?tutor={self.tutors[1].user.id}'))
+        self.assertEqual(self.student_ids(2), self.get_user_ids(f'{url}?course={self.courses[0].id}&gender={Gender.MALE}&search=sid'))
+        self.assertEqual(self.student_ids(0, 1, 2), self.get_user_ids(f'{url}?study_group={self.groups[0].id},{self.groups[1].id}'))
+
+    def test_courses(self):
+        url = reverse('course-list')
+
+        self.assertEqual([self.courses[0].id], self.get_ids(f'{url}?tutor={self.tutors[0].user.id}'))
+        # Both subjects of the first course match it once.
+        self.assertEqual([self.courses[1].id, self.courses[0].id], self.get_ids(f'{url}?subject={self.subjects[0].id},{self.subjects[1].id}'))
+        self.assertEqual([self.courses[0].id], self.get_ids(f'{url}?subject={self.subjects[0].id}'))
+
+    def test_invalid_values(self):
+        response = self.client.get(reverse('student-list') + '?gender=other')
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('gender', response.data)
+
+        response = self.client.get(reverse('course-list') + '?tutor=abc')
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('tutor', response.data)
+
+    def test_prefix_search(self):
+        self.assertEqual(self.student_ids(1), self.get_user_ids(reverse('student-list') + '?search=mar'))
+        # Every word has to match one of the fields.
+        self.assertEqual(self.student_ids(0), self.get_user_ids(reverse('student-list') + '?search=iv%20pet'))
+        self.assertEqual([self.courses[1].id], self.get_ids(reverse('course-list') + '?search=астр'))
+        self.assertEqual(['ПС-101'], [item['name'] for item in self.get_results(reverse('studygroup-list') + '?search=пс-')])
+        self.assertEqual([tutor.user.id for tutor in self.tutors], self.get_user_ids(reverse('tutor-list') + '?search=anna'))
+        self.assertEqual([], self.get_ids(reverse('user-list') + '?search=%25'))
+
+    def test_role(self):
+        ids = self.get_ids(reverse('user-list') + f'?role={Role.TUTOR}')
+
+        self.assertEqual([tutor.user.id for tutor in self.tutors], ids)
+
+    def test_fuzzy_search(self):
+        if not has_trigram(connection.alias):
+            self.skipTest('pg_trgm is not installed')
+
+        self.assertEqual(self.student_ids(2), self.get_user_ids(reverse('student-list') + '?search=sidorof'))
+        self.assertEqual([self.courses[0].id], self.get_ids(reverse('course-list') + '?search=психолгия'))
@@ -0,0 +1,56 @@
+from unittest import skipUnless
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.metrics import prometheus_client
+from study.models import User, Course, Report, ReportType, Role, Status
+
+
+@skipUnless(prometheus_client, 'prometheus_client is not installed')
+class MetricsTestCase(APITestCase):
+    def sample(self, name, **labels):
+        return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_metrics(self):
+        Course.objects.create(name='Психология')
+        labels = {'view': 'CourseViewSet', 'action': 'list', 'method': 'GET', 'status': '200'}
+        before = self.sample('api_request_duration_seconds_count', **labels)
+        queries_before = self.sample('api_request_db_queries_sum', **labels)
+
+        response = self.client.get(reverse('course-list'))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(before + 1, self.sample('api_request_duration_seconds_count', **labels))
+        self.assertEqual(queries_before + 3, self.sample('api_request_db_queries_sum', **labels))
+        self.assertGreater(self.sample('api_response_size_bytes_sum', **labels), 0)
+
+    def test_metrics_endpoint(self):
+        Report.objects.create(type=ReportType.COURSE, status=Status.CREATED)
+        Report.objects.create(type=ReportType.GROUP, status=Status.COMPLETED)
+        self.client.get(reverse('subject-list'))
+
+        with override_settings(METRICS_ALLOWED_NETWORKS=['127.0.0.0/8']):
+            response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        content = response.content.decode()
+        self.assertIn('report_queue_depth{status="created"} 1.0', content)
+        self.assertIn('report_queue_depth{status="processed"} 0.0', content)
+        self.assertIn('view="SubjectViewSet"', content)
+
+    def test_metrics_access(self):
+        url = reverse('metrics')
+        self.assertEqual(status.HTTP_403_FORBIDDEN, self.client.get(url).status_code)
+
+        with override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8']):
+            self.assertEqual(status.HTTP_403_FORBIDDEN, self.client.get(url).status_code)
+            self.assertEqual(status.HTTP_200_OK, self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code)
+
+        self.client.force_login(User.objects.create(username='user1', role=Role.ADMIN))
+        self.assertEqual(status.HTTP_403_FORBIDDEN, self.client.get(url).status_code)
+
+        self.client.force_login(User.objects.create(username='user2', is_staff=True))
+        self.assertEqual(status.HTTP_200_OK, self.client.get(url).status_code)
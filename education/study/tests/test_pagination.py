@@ -0,0 +1,76 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.models import User, Student, Course, Role, Report, ReportType, Status
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        for name in ['Психология', 'Астрономия', 'Психология', 'Биология', 'Психология']:
+            Course.objects.create(name=name)
+        self.expected = list(Course.objects.order_by('name', 'id').values_list('id', flat=True))
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            ids.extend(item['id'] for item in response.data['results'])
+            last = response.data
+            url = response.data['next']
+        return ids, last
+
+    def test_forward(self):
+        ids, last = self.walk(reverse('course-list') + '?page_size=2')
+        self.assertEqual(self.expected, ids)
+        self.assertIsNotNone(last['previous'])
+
+    def test_backward(self):
+        _, last = self.walk(reverse('course-list') + '?page_size=2')
+
+        ids = []
+        url = last['previous']
+        while url:
+            response = self.client.get(url)
+            ids = [item['id'] for item in response.data['results']] + ids
+            url = response.data['previous']
+        self.assertEqual(self.expected[:-1], ids)
+
+    def test_single_page(self):
+        response = self.client.get(reverse('course-list'))
+        self.assertEqual(self.expected, [item['id'] for item in response.data['results']])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_cap(self):
+        response = self.client.get(reverse('course-list') + '?page_size=100')
+        self.assertEqual(3, len(response.data['results']))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('course-list') + '?cursor=garbage')
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_datetime_ordering(self):
+        for report_status in [Status.COMPLETED, Status.COMPLETED, Status.CREATED]:
+            Report.objects.create(type=ReportType.COURSE, status=report_status)
+        expected = list(Report.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+        ids, _ = self.walk(reverse('report-list') + '?page_size=1')
+        self.assertEqual(expected, ids)
+
+    def test_id_ordering(self):
+        for i in range(3):
+            user = User.objects.create(username=f'student{i}', password='student', role=Role.STUDENT)
+            Student.objects.create(user_id=user.id)
+        expected = list(Student.objects.order_by('id').values_list('user_id', flat=True))
+
+        users = []
+        url = reverse('student-list') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            users.extend(item['user']['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(expected, users)
@@ -0,0 +1,133 @@
+import threading
+from time import sleep
+
+import psycopg2
+from django.db import connection, connections
+from django.test import TestCase
+
+from study.db.pool import ConnectionPool, PoolTimeout
+from study.metrics import prometheus_client
+
+
+class ConnectionPoolTestCase(TestCase):
+    def make_pool(self, **options):
+        params = connection.get_connection_params()
+        pool = ConnectionPool('test', lambda: psycopg2.connect(**params), {'CHECK_INTERVAL': 0, **options})
+        self.addCleanup(pool.close)
+        return pool
+
+    def backend_pid(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            return cursor.fetchone()[0]
+
+    def test_reuse(self):
+        pool = self.make_pool(MAX_SIZE=2)
+
+        conn = pool.getconn()
+        pool.putconn(conn)
+
+        self.assertIs(conn, pool.getconn())
+        self.assertEqual(1, pool.size)
+
+    def test_fill(self):
+        pool = self.make_pool(MIN_SIZE=2)
+        pool.fill()
+
+        self.assertEqual(2, len(pool.idle))
+
+    def test_timeout(self):
+        pool = self.make_pool(MAX_SIZE=1, TIMEOUT=0.05)
+        pool.getconn()
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+
+    def test_wait(self):
+        pool = self.make_pool(MAX_SIZE=1, TIMEOUT=5)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, (conn, )).start()
+
+        self.assertIs(conn, pool.getconn())
+
+    def test_health_check(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        pid = self.backend_pid(conn)
+        pool.putconn(conn)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+        sleep(0.05)
+
+        replacement = pool.getconn()
+        self.assertIsNot(conn, replacement)
+        self.assertNotEqual(pid, self.backend_pid(replacement))
+        self.assertEqual(1, pool.size)
+
+    def test_skip_check_within_interval(self):
+        pool = self.make_pool(CHECK_INTERVAL=60)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.close()
+
+        self.assertIsNot(conn, pool.getconn())
+
+    def test_release_rolls_back(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        with conn.cursor() as cursor:
+            cursor.execute('CREATE TEMP TABLE pool_test (id integer)')
+            with self.assertRaises(psycopg2.Error):
+                cursor.execute('SELECT missing FROM pool_test')
+        pool.putconn(conn)
+
+        conn = pool.getconn()
+        self.assertEqual(psycopg2.extensions.TRANSACTION_STATUS_IDLE, conn.info.transaction_status)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pool_test')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_max_lifetime(self):
+        pool = self.make_pool(MAX_LIFETIME=0)
+        conn = pool.getconn()
+        pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(0, pool.size)
+
+    def test_closed(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        pool.close()
+        pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn()
+
+
+class PooledBackendTestCase(TestCase):
+    def test_close_returns_connection(self):
+        wrapper = connections.create_connection('default')
+        self.addCleanup(wrapper.close)
+
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        self.assertFalse(raw.closed)
+
+        wrapper.ensure_connection()
+        self.assertIs(raw, wrapper.connection)
+
+    def test_metrics(self):
+        if prometheus_client is None:
+            self.skipTest('prometheus_client is not installed')
+
+        wrapper = connections.create_connection('default')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+
+        in_use = prometheus_client.REGISTRY.get_sample_value('db_pool_connections', {'alias': 'default', 'state': 'in_use'})
+        self.assertGreaterEqual(in_use, 1)
+        self.assertIsNotNone(prometheus_client.REGISTRY.get_sample_value('db_pool_wait_seconds_count', {'alias': 'default'}))
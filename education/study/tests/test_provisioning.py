@@ -0,0 +1,107 @@
+import csv
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from study.models import User, Role
+from study.provisioning import provision_users, defer_token_creation
+
+
+class ProvisioningTestCase(TestCase):
+    def test_signal_creates_token(self):
+        user = User.objects.create(username='user1', password='user1')
+        self.assertTrue(Token.objects.filter(user=user).exists())
+
+    def test_provision_users(self):
+        User.objects.create(username='user0')
+        rows = [{'username': f'user{i}', 'first_name': 'Ivan', 'last_name': f'Petrov{i}', 'role': Role.STUDENT} for i in range(25)]
+
+        with self.assertNumQueries(15):
+            created, skipped, errors = provision_users(rows, batch_size=10)
+
+        self.assertEqual(24, len(created))
+        self.assertEqual(['user0'], skipped)
+        self.assertEqual([], errors)
+        self.assertEqual(25, Token.objects.count())
+        user = User.objects.get(username='user5')
+        self.assertEqual(Role.STUDENT, user.role)
+        self.assertFalse(user.has_usable_password())
+
+    def test_password(self):
+        created, _, _ = provision_users([{'username': 'user1', 'password': 'secret'}])
+        self.assertTrue(User.objects.get(pk=created[0].pk).check_password('secret'))
+
+    def test_invalid_role(self):
+        created, skipped, errors = provision_users([
+            {'username': 'user1', 'role': 'superadmin'},
+            {'username': 'user2', 'role': Role.TUTOR},
+            {'username': 'user3', 'role': ''},
+        ])
+
+        self.assertEqual(['user2', 'user3'], [user.username for user in created])
+        self.assertEqual([{'row': 1, 'username': 'user1', 'errors': {'role': ['"superadmin" is not a valid role']}}], errors)
+        self.assertFalse(User.objects.filter(username='user1').exists())
+        self.assertIsNone(User.objects.get(username='user3').role)
+
+    def test_invalid_username(self):
+        created, skipped, errors = provision_users([
+            {'username': 'user1'},
+            {'username': ''},
+            {'first_name': 'Ivan'},
+            {'username': 'x' * 151},
+            {'username': 'user 2'},
+            {'username': 'user1'},
+            {'username': 'user3', 'email': 'not an email'},
+        ], batch_size=3)
+
+        self.assertEqual(['user1'], [user.username for user in created])
+        self.assertEqual([2, 3, 4, 5, 6, 7], [error['row'] for error in errors])
+        self.assertEqual([['username']] * 5 + [['email']], [list(error['errors']) for error in errors])
+        self.assertEqual(User._meta.get_field('username').error_messages['blank'], errors[0]['errors']['username'][0])
+        self.assertEqual(['"user1" is repeated in the file'], errors[4]['errors']['username'])
+        self.assertEqual(1, User.objects.count())
+
+    def test_hash_workers(self):
+        rows = [{'username': f'user{i}', 'password': f'secret{i}'} for i in range(4)]
+        created, _, _ = provision_users(rows, hash_workers=2)
+
+        for i, user in enumerate(User.objects.filter(pk__in=[user.pk for user in created]).order_by('username')):
+            self.assertTrue(user.check_password(f'secret{i}'))
+
+    def test_defer_token_creation(self):
+        with CaptureQueriesContext(connection) as queries:
+            with defer_token_creation():
+                for i in range(10):
+                    User.objects.create(username=f'user{i}')
+
+        token_queries = [query for query in queries if 'authtoken_token' in query['sql']]
+        self.assertEqual(2, len(token_queries))
+        self.assertEqual(10, Token.objects.count())
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'users.csv')
+            tokens = os.path.join(tmp, 'tokens.csv')
+            with open(source, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('username', 'first_name', 'last_name', 'email', 'role'))
+                writer.writerow(('user1', 'Ivan', 'Petrov', 'ivan@example.com', 'student'))
+                writer.writerow(('user2', 'Petr', 'Ivanov', '', 'tutor'))
+                writer.writerow(('user3', 'Anna', 'Ivanova', '', 'owner'))
+
+            out = io.StringIO()
+            call_command('provision_users', source, tokens_output=tokens, stdout=out)
+
+            with open(tokens, newline='') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual({'user1', 'user2'}, {row['username'] for row in rows})
+        self.assertEqual(Token.objects.get(user__username='user1').key, next(row['token'] for row in rows if row['username'] == 'user1'))
+        self.assertIn('Invalid row 3 (user3): role: "owner" is not a valid role', out.getvalue())
+        self.assertIn('Created 2 user(s), skipped 0, invalid 1', out.getvalue())
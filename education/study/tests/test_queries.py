@@ -0,0 +1,59 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, Report, ReportType, Status
+from study.versions import bump_versions
+
+
+ENDPOINTS = [
+    ('user', User, 2, 2),
+    ('tutor', Tutor, 2, 3),
+    ('student', Student, 3, 4),
+    ('course', Course, 3, 4),
+    ('subject', Subject, 2, 3),
+    ('studygroup', StudyGroup, 3, 4),
+    ('report', Report, 2, 2),
+]
+
+
+class QueryCountTestCase(APITestCase):
+    def seed(self, size):
+        users = User.objects.bulk_create(
+            User(username=f'user{i}', first_name=f'Ivan{i}', last_name='Petrov', role=Role.STUDENT) for i in range(size * 2)
+        )
+        tutors = Tutor.objects.bulk_create(Tutor(user=user) for user in users[:size])
+        subjects = Subject.objects.bulk_create(Subject(name=f'Subject {i}') for i in range(size))
+        courses = Course.objects.bulk_create(Course(name=f'Course {i}', tutor=tutors[i]) for i in range(size))
+        Course.subjects.through.objects.bulk_create(
+            Course.subjects.through(course=course, subject=subject)
+            for i, course in enumerate(courses) for subject in subjects[i:i + 3]
+        )
+        groups = StudyGroup.objects.bulk_create(StudyGroup(name=f'q-{i}', course=courses[i]) for i in range(size))
+        Student.objects.bulk_create(
+            Student(user=user, gender=Gender.FEMALE if i % 2 else Gender.MALE, study_group=groups[i])
+            for i, user in enumerate(users[size:])
+        )
+        Report.objects.bulk_create(Report(type=ReportType.COURSE, status=Status.COMPLETED) for _ in range(size))
+        bump_versions(User, Tutor, Student, StudyGroup, Subject, Course, Report)
+
+    def assert_queries(self, size):
+        self.seed(size)
+
+        for basename, model, list_queries, detail_queries in ENDPOINTS:
+            with self.subTest(endpoint=basename, size=size):
+                with self.assertNumQueries(list_queries):
+                    response = self.client.get(reverse(f'{basename}-list'), {'page_size': size})
+                self.assertEqual(status.HTTP_200_OK, response.status_code)
+                self.assertEqual(size, len(response.data['results']))
+
+                pk = model.objects.order_by('-id').values_list('id', flat=True).first()
+                with self.assertNumQueries(detail_queries):
+                    response = self.client.get(reverse(f'{basename}-detail', args=(pk,)))
+                self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_10_rows(self):
+        self.assert_queries(10)
+
+    def test_1000_rows(self):
+        self.assert_queries(1000)
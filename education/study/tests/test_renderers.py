@@ -0,0 +1,107 @@
+import datetime
+import decimal
+import io
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from study import parsers, renderers
+from study.models import User, Role, Report, ReportType
+from study.parsers import FastJSONParser
+from study.renderers import FastJSONRenderer
+from study.selializers import ReportSerializer
+
+
+class FastJSONRendererTestCase(TestCase):
+    data = {
+        'id': 1,
+        'name': 'Психология',
+        'lazy': gettext_lazy('Russian'),
+        'created_at': datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        'date': datetime.date(2024, 1, 2),
+        'time': datetime.time(3, 4, 5),
+        'duration': datetime.timedelta(hours=1),
+        'price': decimal.Decimal('1.50'),
+        'uuid': uuid.UUID('12345678123456781234567812345678'),
+        'separator': 'a b c',
+        'nested': [{'a': None, 'b': True, 'c': 1.5}],
+        1: 'int key',
+    }
+
+    def test_identical(self):
+        self.assertEqual(JSONRenderer().render(self.data), FastJSONRenderer().render(self.data))
+
+    def test_serializer_data(self):
+        Report.objects.create(type=ReportType.COURSE, created_at=timezone.now())
+        data = ReportSerializer(Report.objects.all(), many=True).data
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
+
+    def test_floats(self):
+        data = {'values': [0.1, -2.5, 1e15, 1e16, -1e20, 1e-4, 1e-7, 0.0, -0.0, 123456.789]}
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
+
+    def test_non_finite_floats(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'nested': [{'value': value}]})
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render(value)
+
+    def test_indent(self):
+        self.assertEqual(
+            JSONRenderer().render(self.data, 'application/json; indent=4'),
+            FastJSONRenderer().render(self.data, 'application/json; indent=4'),
+        )
+
+    def test_none(self):
+        self.assertEqual(b'', FastJSONRenderer().render(None))
+
+    def test_fallback(self):
+        with mock.patch.object(renderers, 'dumps', None):
+            self.assertEqual(JSONRenderer().render(self.data), FastJSONRenderer().render(self.data))
+
+
+class FastJSONParserTestCase(TestCase):
+    def parse(self, data, **context):
+        return FastJSONParser().parse(io.BytesIO(data), parser_context=context)
+
+    def test_parse(self):
+        data = '{"name": "Психология", "ids": [1, 2], "flag": true, "value": null}'.encode()
+        self.assertEqual(JSONParser().parse(io.BytesIO(data)), self.parse(data))
+
+    def test_big_int(self):
+        self.assertEqual({'id': 2 ** 70}, self.parse(b'{"id": %d}' % 2 ** 70))
+
+    def test_invalid(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"name": ')
+
+    def test_nan(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"value": NaN}')
+
+    def test_other_encoding(self):
+        data = '{"name": "Психология"}'.encode('utf-16')
+        self.assertEqual({'name': 'Психология'}, self.parse(data, encoding='utf-16'))
+
+    def test_fallback(self):
+        with mock.patch.object(parsers, 'loads', None):
+            self.assertEqual({'id': 1}, self.parse(b'{"id": 1}'))
+
+
+class FastJSONApiTestCase(APITestCase):
+    def test_round_trip(self):
+        self.client.force_authenticate(User.objects.create(username='admin', role=Role.ADMIN))
+        response = self.client.post(reverse('subject-list'), {'name': 'Социология'}, format='json')
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual('application/json', response['Content-Type'])
+        self.assertEqual('Социология', response.json()['name'])
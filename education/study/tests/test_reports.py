@@ -0,0 +1,288 @@
+import csv
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from study.models import User, Tutor, Student, StudyGroup, Course, Role, Gender, Report, ReportType, ReportFormat, Status, StudyGroupStats
+from study.stats import rebuild_stats
+from study.worker import claim_report, process_report, process_next_report, requeue_stale_reports
+
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReportWorkerTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user_tutor = User.objects.create(username='user1', password='user1', first_name='Ivan', last_name='Sidorov', role=Role.TUTOR)
+        tutor = Tutor.objects.create(user_id=user_tutor.id)
+        self.course = Course.objects.create(name='Психология', tutor_id=tutor.id)
+        self.study_group = StudyGroup.objects.create(name='q-2', course_id=self.course.id)
+
+        for i, gender in enumerate([Gender.MALE, Gender.MALE, Gender.FEMALE]):
+            user = User.objects.create(username=f'student{i}', password='student', role=Role.STUDENT)
+            Student.objects.create(user_id=user.id, gender=gender, study_group_id=self.study_group.id)
+
+    def read_rows(self, report):
+        with report.file.open('r') as f:
+            return list(csv.reader(f))
+
+    def test_course_report(self):
+        report = Report.objects.create(type=ReportType.COURSE)
+
+        processed = process_next_report()
+
+        report.refresh_from_db()
+        self.assertEqual(report.id, processed.id)
+        self.assertEqual(Status.COMPLETED, report.status)
+        rows = self.read_rows(report)
+        self.assertEqual([str(self.course.id), 'Психология', 'Ivan Sidorov', '0', '1', '3'], rows[1])
+
+    def test_groups_report(self):
+        report = Report.objects.create(type=ReportType.GROUP)
+
+        process_next_report()
+
+        report.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, report.status)
+        rows = self.read_rows(report)
+        self.assertEqual([str(self.study_group.id), 'q-2', 'Психология', '3', '2', '1'], rows[1])
+
+    @skipUnless(load_workbook, 'openpyxl is not installed')
+    def test_xlsx_report(self):
+        report = Report.objects.create(type=ReportType.GROUP, format=ReportFormat.XLSX)
+
+        with override_settings(REPORT_CHUNK_SIZE=1):
+            process_next_report()
+
+        report.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, report.status)
+        self.assertTrue(report.file.name.endswith('.xlsx'))
+        with report.file.open('rb') as f:
+            rows = list(load_workbook(f, read_only=True).active.values)
+        self.assertEqual((self.study_group.id, 'q-2', 'Психология', 3, 2, 1), rows[1])
+
+    def test_reuse_unchanged(self):
+        first = Report.objects.create(type=ReportType.COURSE)
+        process_next_report()
+        first.refresh_from_db()
+
+        second = Report.objects.create(type=ReportType.COURSE)
+        with mock.patch('study.worker.build_report') as build_report:
+            process_next_report()
+        build_report.assert_not_called()
+
+        second.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, second.status)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.watermark, second.watermark)
+
+    def test_regenerate_changed(self):
+        first = Report.objects.create(type=ReportType.GROUP)
+        process_next_report()
+        first.refresh_from_db()
+
+        StudyGroup.objects.create(name='q-3', course_id=self.course.id)
+        second = Report.objects.create(type=ReportType.GROUP)
+        process_next_report()
+
+        second.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, second.status)
+        self.assertNotEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.watermark, second.watermark)
+        self.assertEqual(3, len(self.read_rows(second)))
+
+    def test_regenerate_after_stats_repair(self):
+        first = Report.objects.create(type=ReportType.GROUP)
+        process_next_report()
+        first.refresh_from_db()
+
+        StudyGroupStats.objects.filter(study_group=self.study_group).update(students_count=10)
+        rebuild_stats()
+        second = Report.objects.create(type=ReportType.GROUP)
+        process_next_report()
+
+        second.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, second.status)
+        self.assertNotEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.watermark, second.watermark)
+
+    def test_claim_marks_processed(self):
+        report = Report.objects.create(type=ReportType.COURSE)
+
+        claimed = claim_report()
+
+        report.refresh_from_db()
+        self.assertEqual(report.id, claimed.id)
+        self.assertEqual(Status.PROCESSED, report.status)
+        self.assertIsNotNone(report.started_at)
+        self.assertIsNone(claim_report())
+
+    def test_empty_queue(self):
+        Report.objects.create(type=ReportType.COURSE, status=Status.COMPLETED)
+        self.assertIsNone(process_next_report())
+
+    def test_failed(self):
+        report = Report.objects.create(type=ReportType.COURSE)
+
+        with mock.patch('study.worker.build_report', side_effect=RuntimeError), self.assertLogs('study.worker', 'ERROR'):
+            process_next_report()
+
+        report.refresh_from_db()
+        self.assertEqual(Status.FALIED, report.status)
+
+    def test_requeue_stale(self):
+        report = Report.objects.create(type=ReportType.COURSE, status=Status.PROCESSED, started_at=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(1, requeue_stale_reports(3600))
+
+        report.refresh_from_db()
+        self.assertEqual(Status.CREATED, report.status)
+
+
+    def test_requeued_while_building(self):
+        report = Report.objects.create(type=ReportType.COURSE)
+        claims, files = [], []
+
+        def requeue_and_claim(report):
+            # The report is requeued as stale and picked up by another worker
+            # before this one is done with it.
+            Report.objects.filter(pk=report.pk).update(started_at=timezone.now() - timedelta(hours=2))
+            requeue_stale_reports(3600)
+            claims.append(claim_report())
+            report.file.save('stale.csv', ContentFile(b'stale'), save=False)
+            files.append(report.file.path)
+
+        with mock.patch('study.worker.build_report', side_effect=requeue_and_claim), self.assertLogs('study.worker', 'WARNING'):
+            self.assertFalse(process_report(claim_report()))
+
+        report.refresh_from_db()
+        self.assertEqual(Status.PROCESSED, report.status)
+        self.assertEqual(claims[0].started_at, report.started_at)
+        self.assertFalse(report.file)
+        self.assertFalse(os.path.exists(files[0]))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReportReuseApiTestCase(APITestCase):
+    def setUp(self):
+        self.user_admin = User.objects.create(username='user1', password='user1', first_name='Ivan', last_name='Petrov', role=Role.ADMIN)
+
+    def test_create_reuses_completed(self):
+        Report.objects.create(type=ReportType.COURSE)
+        previous = process_next_report()
+
+        self.client.force_login(self.user_admin)
+        response = self.client.post(reverse('report-list'), data={'type': ReportType.COURSE, 'created_at': timezone.now().strftime('%Y-%m-%dT%H:%M:%S')}, format='json')
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        report = Report.objects.get(id=response.data['id'])
+        self.assertEqual(Status.COMPLETED, report.status)
+        self.assertEqual(previous.file.name, report.file.name)
+
+    def test_create_queues_changed(self):
+        Report.objects.create(type=ReportType.COURSE)
+        process_next_report()
+        Course.objects.create(name='Психология')
+
+        self.client.force_login(self.user_admin)
+        response = self.client.post(reverse('report-list'), data={'type': ReportType.COURSE, 'created_at': timezone.now().strftime('%Y-%m-%dT%H:%M:%S')}, format='json')
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(Status.CREATED, Report.objects.get(id=response.data['id']).status)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReportDownloadApiTestCase(APITestCase):
+    def setUp(self):
+        self.user_admin = User.objects.create(username='user1', password='user1', first_name='Ivan', last_name='Petrov', role=Role.ADMIN)
+        self.user_tutor = User.objects.create(username='user2', password='user2', first_name='Ivan', last_name='Sidorov', role=Role.TUTOR)
+        self.report = Report.objects.create(type=ReportType.COURSE)
+        process_next_report()
+        self.report.refresh_from_db()
+        with self.report.file.open('rb') as f:
+            self.content = f.read()
+        self.url = reverse('report-download', args=(self.report.id,))
+
+    def test_download(self):
+        self.client.force_login(self.user_admin)
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(self.content, b''.join(response.streaming_content))
+        self.assertEqual('bytes', response['Accept-Ranges'])
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_not_modified(self):
+        self.client.force_login(self.user_admin)
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+    def test_range(self):
+        self.client.force_login(self.user_admin)
+        size = len(self.content)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(status.HTTP_206_PARTIAL_CONTENT, response.status_code)
+        self.assertEqual(self.content[2:6], b''.join(response.streaming_content))
+        self.assertEqual(f'bytes 2-5/{size}', response['Content-Range'])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(self.content[-3:], b''.join(response.streaming_content))
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, response.status_code)
+
+    def test_range_stale_if_range(self):
+        self.client.force_login(self.user_admin)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(self.content, b''.join(response.streaming_content))
+
+    @override_settings(SENDFILE_BACKEND='nginx', SENDFILE_URL='/protected/')
+    def test_x_accel_redirect(self):
+        self.client.force_login(self.user_admin)
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(f'/protected/{self.report.file.name}', response['X-Accel-Redirect'])
+        self.assertEqual(b'', response.content)
+
+    def test_not_ready(self):
+        report = Report.objects.create(type=ReportType.GROUP)
+        self.client.force_login(self.user_admin)
+        response = self.client.get(reverse('report-download', args=(report.id,)))
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_permissions(self):
+        response = self.client.get(self.url)
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+        self.client.force_login(self.user_tutor)
+        response = self.client.get(self.url)
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
@@ -0,0 +1,148 @@
+import csv
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from study.models import User, Tutor, Student, StudyGroup, Course, Role, Gender, StudyGroupStats, CourseStats
+from study.roster import import_roster, RosterError
+
+
+def roster(*rows, header=('username', 'first_name', 'last_name', 'gender', 'group', 'course')):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    writer.writerows(rows)
+    out.seek(0)
+    return out
+
+
+class RosterImportTestCase(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name='Python')
+        self.group = StudyGroup.objects.create(name='py-1', course=self.course)
+        user = User.objects.create(username='student1', first_name='Ivan', last_name='Petrov', role=Role.STUDENT)
+        self.student = Student.objects.create(user=user, study_group=self.group)
+
+    def test_import(self):
+        result = import_roster(roster(
+            ('student1', 'Ivan', 'Sidorov', 'male', 'py-2', 'Python'),
+            ('student2', 'Anna', 'Ivanova', 'FEMALE', 'go-1', 'Go'),
+            ('student3', 'Petr', 'Petrov', '', 'py-1', 'Python'),
+        ))
+
+        self.assertEqual(3, result['rows'])
+        self.assertEqual(0, result['skipped'])
+        self.assertEqual(1, result['courses_created'])
+        self.assertEqual(2, result['groups_created'])
+        self.assertEqual((2, 1), (result['users_created'], result['users_updated']))
+        self.assertEqual((2, 1), (result['students_created'], result['students_updated']))
+
+        student = Student.objects.select_related('user', 'study_group__course').get(user__username='student1')
+        self.assertEqual('Sidorov', student.user.last_name)
+        self.assertEqual(('py-2', 'Python'), (student.study_group.name, student.study_group.course.name))
+
+        user = User.objects.get(username='student2')
+        self.assertEqual(Role.STUDENT, user.role)
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(Token.objects.filter(user=user).exists())
+        self.assertEqual(Gender.FEMALE, user.student.gender)
+
+        self.assertEqual(1, StudyGroupStats.objects.get(study_group=self.group).students_count)
+        self.assertEqual(2, CourseStats.objects.get(course=self.course).students_count)
+        self.assertEqual(1, CourseStats.objects.get(course__name='Go').groups_count)
+
+    def test_reimport_is_noop(self):
+        rows = [('student1', 'Ivan', 'Petrov', 'MALE', 'py-1', 'Python')]
+        result = import_roster(roster(*rows))
+        self.assertEqual(0, result['users_updated'] + result['students_updated'] + result['groups_created'])
+
+    def test_duplicate_username_keeps_last_row(self):
+        result = import_roster(roster(
+            ('student2', 'Anna', 'Ivanova', 'FEMALE', 'py-1', 'Python'),
+            ('student2', 'Anna', 'Sidorova', 'FEMALE', 'py-1', 'Python'),
+        ))
+        self.assertEqual(1, result['users_created'])
+        self.assertEqual('Sidorova', User.objects.get(username='student2').last_name)
+
+    def test_invalid_rows_are_skipped(self):
+        result = import_roster(roster(
+            ('student2', 'Anna', 'Ivanova', 'UNKNOWN', 'py-1', 'Python'),
+            ('', 'Petr', 'Petrov', 'MALE', 'py-1', 'Python'),
+            ('student3', 'Petr', 'Petrov', 'MALE', '', 'Python'),
+            ('student4', 'Petr', 'Petrov', 'MALE', 'py-1', 'Python'),
+        ))
+        self.assertEqual(3, result['skipped'])
+        self.assertEqual([2, 3, 4], [error['line'] for error in result['errors']])
+        self.assertEqual(1, result['students_created'])
+
+    def test_non_students_are_skipped(self):
+        tutor = Tutor.objects.create(user=User.objects.create(username='tutor1', first_name='Anna', last_name='Petrova', role=Role.TUTOR))
+        self.course.tutor = tutor
+        self.course.save()
+
+        result = import_roster(roster(
+            ('tutor1', 'Hacked', 'Name', 'FEMALE', 'py-1', 'Python'),
+            ('student2', 'Anna', 'Ivanova', 'FEMALE', 'py-1', 'Python'),
+        ))
+
+        self.assertEqual(1, result['skipped'])
+        self.assertEqual([{'line': 2, 'errors': ['"tutor1" is not a student']}], result['errors'])
+        self.assertEqual((1, 0), (result['users_created'], result['users_updated']))
+        self.assertEqual(1, result['students_created'])
+        tutor.user.refresh_from_db()
+        self.assertEqual(('Anna', 'Petrova'), (tutor.user.first_name, tutor.user.last_name))
+        self.assertFalse(Student.objects.filter(user=tutor.user).exists())
+
+    def test_missing_columns(self):
+        with self.assertRaises(RosterError):
+            import_roster(roster(('student2', 'Anna'), header=('username', 'first_name')))
+
+    def test_progress(self):
+        calls = []
+        import_roster(roster(('student2', 'Anna', 'Ivanova', 'FEMALE', 'py-1', 'Python')), progress=calls.append)
+        self.assertEqual([1], calls)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'roster.csv')
+            with open(path, 'w', newline='') as f:
+                f.write(roster(('student2', 'Anna', 'Ivanova', 'FEMALE', 'py-1', 'Python')).getvalue())
+            out = io.StringIO()
+            call_command('import_roster', path, stdout=out)
+
+        self.assertIn('1 user(s) created', out.getvalue())
+        self.assertTrue(Student.objects.filter(user__username='student2', study_group=self.group).exists())
+
+
+class RosterImportApiTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', role=Role.ADMIN)
+        self.tutor = User.objects.create(username='tutor', role=Role.TUTOR)
+        self.url = reverse('student-upload-roster')
+
+    def upload(self):
+        data = roster(('student1', 'Anna', 'Ivanova', 'FEMALE', 'py-1', 'Python')).getvalue().encode()
+        return self.client.post(self.url, {'file': io.BytesIO(data)}, format='multipart')
+
+    def test_upload(self):
+        self.client.force_authenticate(self.admin)
+        response = self.upload()
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, response.data['students_created'])
+
+    def test_upload_requires_admin(self):
+        self.client.force_authenticate(self.tutor)
+        self.assertEqual(status.HTTP_403_FORBIDDEN, self.upload().status_code)
+        self.assertFalse(Student.objects.exists())
+
+    def test_upload_without_file(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, {}, format='multipart')
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
@@ -0,0 +1,140 @@
+from time import time
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from study.middleware import ReplicaMiddleware, PIN_COOKIE, PIN_HEADER
+from study.models import Course
+from study.routers import ReplicaRouter, LagMonitor, lag_monitor, replica_reads, use_replica
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        patcher = mock.patch.object(lag_monitor, 'lag', return_value=0.0)
+        self.lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read(self):
+        self.assertIsNone(self.router.db_for_read(Course))
+        with replica_reads():
+            self.assertEqual('replica', self.router.db_for_read(Course))
+            self.assertIsNone(self.router.db_for_read(Session))
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'replica2'])
+    def test_same_replica_per_context(self):
+        with replica_reads():
+            aliases = {self.router.db_for_read(Course) for _ in range(20)}
+            self.assertEqual(1, len(aliases))
+            self.assertEqual(2, self.lag.call_count)
+            with replica_reads():
+                self.router.db_for_read(Course)
+            self.assertEqual(aliases, {self.router.db_for_read(Course)})
+
+    def test_write(self):
+        with replica_reads():
+            self.assertEqual('default', self.router.db_for_write(Course))
+
+    def test_lagging_replica(self):
+        self.lag.return_value = 10.0
+        with replica_reads():
+            self.assertEqual('default', self.router.db_for_read(Course))
+
+    def test_unreachable_replica(self):
+        self.lag.return_value = None
+        with replica_reads():
+            self.assertEqual('default', self.router.db_for_read(Course))
+
+    def test_atomic_block(self):
+        with mock.patch('study.routers.connections') as connections:
+            connections.__getitem__.return_value.in_atomic_block = True
+            with replica_reads():
+                self.assertEqual('default', self.router.db_for_read(Course))
+
+    def test_allow_migrate(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'study'))
+        self.assertIsNone(self.router.allow_migrate('default', 'study'))
+
+
+class LagMonitorTestCase(TestCase):
+    def test_primary(self):
+        self.assertEqual(0, LagMonitor().lag('default'))
+
+    @override_settings(REPLICA_LAG_CHECK_INTERVAL=60)
+    def test_cached(self):
+        monitor = LagMonitor()
+        monitor.lag('default')
+        with self.assertNumQueries(0):
+            monitor.lag('default')
+
+    def test_not_streaming(self):
+        monitor = LagMonitor()
+        with mock.patch('study.routers.connections') as connections:
+            cursor = connections.__getitem__.return_value.cursor.return_value.__enter__.return_value
+            cursor.fetchone.return_value = (None, )
+            self.assertIsNone(monitor.lag('replica'))
+            self.assertFalse(monitor.is_healthy('replica'))
+
+    def test_error(self):
+        monitor = LagMonitor()
+        with mock.patch('study.routers.connections') as connections:
+            connections.__getitem__.return_value.cursor.side_effect = DatabaseError
+            self.assertIsNone(monitor.lag('replica'))
+            self.assertFalse(monitor.is_healthy('replica'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=5)
+class ReplicaMiddlewareTestCase(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def get_response(request):
+            self.seen.append(use_replica.get() is not None)
+            return HttpResponse()
+
+        self.middleware = ReplicaMiddleware(get_response)
+
+    def test_safe_method(self):
+        response = self.middleware(self.factory.get('/'))
+
+        self.assertEqual([True], self.seen)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertFalse(use_replica.get())
+
+    def test_write_pins(self):
+        response = self.middleware(self.factory.post('/'))
+
+        self.assertEqual([False], self.seen)
+        until = float(response.cookies[PIN_COOKIE].value)
+        self.assertGreater(until, time() + 4)
+        self.assertEqual(response.cookies[PIN_COOKIE].value, response[PIN_HEADER])
+
+        self.factory.cookies[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        self.middleware(self.factory.get('/'))
+        self.assertEqual([False, False], self.seen)
+
+    def test_header(self):
+        self.middleware(self.factory.get('/', HTTP_X_DB_PIN=str(time() + 5)))
+        self.assertEqual([False], self.seen)
+
+    def test_expired_pin(self):
+        self.factory.cookies[PIN_COOKIE] = str(time() - 1)
+        self.middleware(self.factory.get('/'))
+        self.assertEqual([True], self.seen)
+
+    async def test_async(self):
+        async def get_response(request):
+            self.seen.append(use_replica.get() is not None)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        await middleware(self.factory.get('/'))
+        response = await middleware(self.factory.put('/'))
+
+        self.assertEqual([True, False], self.seen)
+        self.assertIn(PIN_COOKIE, response.cookies)
@@ -1,7 +1,18 @@
+from django.http import QueryDict
 from django.test import TestCase
 from datetime import datetime
+from unittest import mock
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
-from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, Report, ReportType, Status
+from study import compiled as compiled_module
+from study.api.v1.courses import CourseViewSet
+from study.compiled import CompiledSerializer, NotCompilable
+from study.fieldsets import parse_shape
+
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, Report, ReportType, ReportFormat, Status
 from study.selializers import UserSerializer, TutorReadSerializer, TutorWriteSerializer, SubjectSerializer,\
                             CourseSerializer, StudyGroupSerializer, StudentReadSerializer, StudentWriteSerializer,\
                             ReportSerializer
@@ -223,8 +234,110 @@ class ReportSerializersTestCase(TestCase):
                 'id': report.id,
                 'type': ReportType.COURSE,
                 'status': Status.CREATED,
+                'format': ReportFormat.CSV,
                 'created_at': datetime.strftime(report.created_at, "%Y-%m-%dT%H:%M:%S"),
                 'file': None
             }
         ]
         self.assertEqual(expected_data, data)
+
+
+class CompiledSerializerTestCase(TestCase):
+    def setUp(self):
+        user1 = User.objects.create(username='user1', password='user1', first_name='Ivan', last_name='Petrov', role=Role.TUTOR)
+        user2 = User.objects.create(username='user2', password='user2', first_name='Ivan', last_name='Sidorov', role=Role.STUDENT)
+        user3 = User.objects.create(username='user3', password='user3', first_name='Anna', last_name='Ivanova', role=Role.STUDENT)
+        tutor = Tutor.objects.create(user_id=user1.id)
+
+        subject1 = Subject.objects.create(name='Социология')
+        subject2 = Subject.objects.create(name='Статистика')
+        course = Course.objects.create(name='Психология', tutor_id=tutor.id)
+        course.subjects.add(subject1)
+        course.subjects.add(subject2)
+        Course.objects.create(name='Без куратора')
+
+        study_group = StudyGroup.objects.create(name='q-2', course_id=course.id)
+        Student.objects.create(user_id=user2.id, gender=Gender.MALE, study_group_id=study_group.id)
+        Student.objects.create(user_id=user3.id, gender=Gender.FEMALE, study_group_id=None)
+        Report.objects.create(type=ReportType.COURSE, status=Status.COMPLETED, file='reports/course_report_1.csv')
+        Report.objects.create(type=ReportType.GROUP, status=Status.CREATED)
+
+    def assert_identical(self, serializer_class, queryset):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        compiled = CompiledSerializer(serializer_class(), queryset.model)
+        self.assertEqual(expected, JSONRenderer().render(compiled.serialize(compiled.get_queryset(queryset))))
+
+    def test_identical(self):
+        cases = [
+            (UserSerializer, User.objects.order_by('id')),
+            (TutorReadSerializer, Tutor.objects.order_by('id')),
+            (TutorWriteSerializer, Tutor.objects.order_by('id')),
+            (SubjectSerializer, Subject.objects.order_by('id')),
+            (CourseSerializer, Course.objects.order_by('id')),
+            (StudyGroupSerializer, StudyGroup.objects.order_by('id')),
+            (StudentReadSerializer, Student.objects.order_by('id')),
+            (StudentWriteSerializer, Student.objects.order_by('id')),
+            (ReportSerializer, Report.objects.order_by('id')),
+        ]
+        for serializer_class, queryset in cases:
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assert_identical(serializer_class, queryset)
+
+    def test_collapsed_tutor(self):
+        context = {'shape': parse_shape(QueryDict('fields=id,name,tutor'))}
+        queryset = Course.objects.order_by('id')
+        expected = CourseSerializer(queryset, many=True, context=context).data
+        compiled = CompiledSerializer(CourseSerializer(context=context), Course)
+
+        self.assertEqual(list(Course.objects.order_by('id').values_list('tutor__user_id', flat=True)), [item['tutor'] for item in expected])
+        self.assertEqual(JSONRenderer().render(expected), JSONRenderer().render(compiled.serialize(compiled.get_queryset(queryset))))
+
+    def test_queries(self):
+        compiled = CompiledSerializer(StudentReadSerializer(), Student)
+        with self.assertNumQueries(2):
+            compiled.serialize(compiled.get_queryset(Student.objects.all()))
+
+    def test_not_compilable(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            full_name = serializers.SerializerMethodField()
+
+            class Meta:
+                model = User
+                fields = ('id', 'full_name')
+
+        with self.assertRaises(NotCompilable):
+            CompiledSerializer(MethodSerializer(), User)
+
+    def get_view(self, view_class):
+        view = view_class()
+        view.request = Request(APIRequestFactory().get('/'))
+        view.format_kwarg = None
+        view.action = 'list'
+        return view
+
+    def test_cache_key(self):
+        class IdOrderedCourseViewSet(CourseViewSet):
+            keyset_ordering = ('id', )
+
+        with mock.patch.object(compiled_module, 'compiled_serializers', compiled_module.OrderedDict()):
+            by_name = self.get_view(CourseViewSet).get_compiled_serializer()
+            by_id = self.get_view(IdOrderedCourseViewSet).get_compiled_serializer()
+
+            self.assertIsNot(by_name, by_id)
+            self.assertIs(by_name, self.get_view(CourseViewSet).get_compiled_serializer())
+
+    def test_cache_eviction(self):
+        class IdOrderedCourseViewSet(CourseViewSet):
+            keyset_ordering = ('id', )
+
+        with mock.patch.object(compiled_module, 'compiled_serializers', compiled_module.OrderedDict()), \
+                mock.patch.object(compiled_module, 'COMPILED_CACHE_SIZE', 2):
+            first = self.get_view(CourseViewSet).get_compiled_serializer()
+            self.get_view(IdOrderedCourseViewSet).get_compiled_serializer()
+            # Using the first entry again makes the second one the oldest.
+            self.get_view(CourseViewSet).get_compiled_serializer()
+            self.get_view(type('OtherCourseViewSet', (CourseViewSet, ), {'keyset_ordering': ('name', )})).get_compiled_serializer()
+
+            self.assertEqual(2, len(compiled_module.compiled_serializers))
+            self.assertIs(first, self.get_view(CourseViewSet).get_compiled_serializer())
+            self.assertNotIn(IdOrderedCourseViewSet, [key[0] for key in compiled_module.compiled_serializers])
@@ -0,0 +1,99 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from study.models import User, Tutor, Student, StudyGroup, Subject, Course, Role, Gender, StudyGroupStats, CourseStats
+from study.stats import rebuild_stats
+
+
+class ReportStatsTestCase(TestCase):
+    def setUp(self):
+        user_tutor = User.objects.create(username='user1', password='user1', first_name='Ivan', last_name='Sidorov', role=Role.TUTOR)
+        tutor = Tutor.objects.create(user_id=user_tutor.id)
+        self.subject1 = Subject.objects.create(name='Социология')
+        self.subject2 = Subject.objects.create(name='Философия')
+        self.course = Course.objects.create(name='Психология', tutor_id=tutor.id)
+        self.course.subjects.add(self.subject1, self.subject2)
+        self.other_course = Course.objects.create(name='Социология', tutor_id=tutor.id)
+        self.group1 = StudyGroup.objects.create(name='q-1', course_id=self.course.id)
+        self.group2 = StudyGroup.objects.create(name='q-2', course_id=self.course.id)
+
+        self.students = []
+        for i, gender in enumerate([Gender.MALE, Gender.MALE, Gender.FEMALE]):
+            user = User.objects.create(username=f'student{i}', password='student', role=Role.STUDENT)
+            self.students.append(Student.objects.create(user_id=user.id, gender=gender, study_group_id=self.group1.id))
+
+    def group_stats(self, group):
+        stats = StudyGroupStats.objects.get(study_group=group)
+        return (stats.students_count, stats.male_count, stats.female_count)
+
+    def course_stats(self, course):
+        stats = CourseStats.objects.get(course=course)
+        return (stats.groups_count, stats.students_count, stats.subjects_count)
+
+    def test_created(self):
+        self.assertEqual((3, 2, 1), self.group_stats(self.group1))
+        self.assertEqual((0, 0, 0), self.group_stats(self.group2))
+        self.assertEqual((2, 3, 2), self.course_stats(self.course))
+        self.assertEqual([], rebuild_stats(dry_run=True))
+
+    def test_student_moved(self):
+        student = Student.objects.get(id=self.students[0].id)
+        student.study_group = self.group2
+        student.gender = Gender.FEMALE
+        student.save()
+
+        self.assertEqual((2, 1, 1), self.group_stats(self.group1))
+        self.assertEqual((1, 0, 1), self.group_stats(self.group2))
+        self.assertEqual((2, 3, 2), self.course_stats(self.course))
+
+    def test_student_deleted(self):
+        self.students[0].user.delete()
+
+        self.assertEqual((2, 1, 1), self.group_stats(self.group1))
+        self.assertEqual((2, 2, 2), self.course_stats(self.course))
+
+    def test_group_moved(self):
+        self.group1.course = self.other_course
+        self.group1.save()
+
+        self.assertEqual((1, 0, 2), self.course_stats(self.course))
+        self.assertEqual((1, 3, 0), self.course_stats(self.other_course))
+
+    def test_group_deleted(self):
+        self.group1.delete()
+
+        self.assertEqual((1, 0, 2), self.course_stats(self.course))
+        self.assertEqual([], rebuild_stats(dry_run=True))
+
+    def test_subjects_changed(self):
+        self.course.subjects.remove(self.subject1)
+        self.assertEqual(1, self.course_stats(self.course)[2])
+
+        self.subject1.course_subjects.add(self.course, self.other_course)
+        self.assertEqual(2, self.course_stats(self.course)[2])
+        self.assertEqual(1, self.course_stats(self.other_course)[2])
+
+        self.subject1.course_subjects.clear()
+        self.assertEqual(1, self.course_stats(self.course)[2])
+        self.assertEqual(0, self.course_stats(self.other_course)[2])
+
+        self.subject2.delete()
+        self.assertEqual(0, self.course_stats(self.course)[2])
+
+    def test_rebuild(self):
+        StudyGroupStats.objects.filter(study_group=self.group1).update(students_count=10)
+        CourseStats.objects.filter(course=self.course).delete()
+
+        drift = rebuild_stats(dry_run=True)
+        self.assertEqual(2, len(drift))
+        self.assertEqual(10, StudyGroupStats.objects.get(study_group=self.group1).students_count)
+
+        out = io.StringIO()
+        call_command('rebuild_report_stats', stdout=out)
+        self.assertIn('Drift found in 2 row(s)', out.getvalue())
+
+        self.assertEqual((3, 2, 1), self.group_stats(self.group1))
+        self.assertEqual((2, 3, 2), self.course_stats(self.course))
+        self.assertEqual([], rebuild_stats(dry_run=True))
@@ -0,0 +1,5 @@
+from education.urls import urlpatterns as sync_urlpatterns
+from study.asyncviews import async_urlpatterns
+
+
+urlpatterns = async_urlpatterns(sync_urlpatterns)
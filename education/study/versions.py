@@ -0,0 +1,33 @@
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ModelVersion
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def bump_versions(*models):
+    labels = {model_label(model) for model in models}
+    now = timezone.now()
+
+    updated = ModelVersion.objects.filter(label__in=labels).update(version=F('version') + 1, updated_at=now)
+    if updated < len(labels):
+        ModelVersion.objects.bulk_create(
+            [ModelVersion(label=label, version=1, updated_at=now) for label in labels], ignore_conflicts=True
+        )
+
+
+def get_versions(*models):
+    labels = [model_label(model) for model in models]
+    versions = dict(ModelVersion.objects.filter(label__in=labels).values_list('label', 'version'))
+    return {label: versions.get(label, 0) for label in labels}
+
+
+def data_watermark(*models):
+    versions = get_versions(*models)
+    key = ','.join(f'{label}:{versions[label]}' for label in sorted(versions))
+    return hashlib.sha1(key.encode()).hexdigest()
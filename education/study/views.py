@@ -1,3 +1,25 @@
-from django.shortcuts import render
+from ipaddress import ip_address, ip_network
 
-# Create your views here.
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+from .metrics import prometheus_client, generate_metrics
+
+
+def metrics_allowed(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    try:
+        address = ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ip_network(network) for network in getattr(settings, 'METRICS_ALLOWED_NETWORKS', ()))
+
+
+def metrics(request):
+    if not metrics_allowed(request):
+        raise PermissionDenied
+    if prometheus_client is None:
+        return HttpResponse('prometheus_client is not installed', status=501, content_type='text/plain')
+    return HttpResponse(generate_metrics(), content_type=prometheus_client.CONTENT_TYPE_LATEST)
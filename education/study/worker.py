@@ -0,0 +1,89 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Report, Status
+from .reports import build_report, report_watermark, find_reusable_report
+from .routers import replica_reads
+from .versions import bump_versions
+
+
+logger = logging.getLogger(__name__)
+
+
+def claim_report():
+    with transaction.atomic():
+        report = Report.objects.select_for_update(skip_locked=True).filter(
+            status=Status.CREATED
+        ).order_by('created_at', 'id').first()
+
+        if report is None:
+            return None
+
+        report.status = Status.PROCESSED
+        report.started_at = timezone.now()
+        report.save(update_fields=['status', 'started_at'])
+
+    return report
+
+
+def requeue_stale_reports(timeout):
+    deadline = timezone.now() - timedelta(seconds=timeout)
+
+    with transaction.atomic():
+        stale = Report.objects.select_for_update(skip_locked=True).filter(
+            status=Status.PROCESSED, started_at__lt=deadline
+        ).values_list('id', flat=True)
+        requeued = Report.objects.filter(id__in=list(stale)).update(status=Status.CREATED, started_at=None)
+        if requeued:
+            bump_versions(Report)
+        return requeued
+
+
+def finish_report(report, fields):
+    # A report that was requeued as stale while this worker was still on it
+    # may have been claimed again; only the current claim records a result.
+    finished = Report.objects.filter(
+        pk=report.pk, status=Status.PROCESSED, started_at=report.started_at
+    ).update(**{field: getattr(report, field) for field in fields})
+    if finished:
+        bump_versions(Report)
+    return bool(finished)
+
+
+def process_report(report):
+    previous = None
+    try:
+        # The watermark is read from the same database as the report data, so
+        # a lagging replica yields an older watermark rather than a wrong one.
+        with replica_reads():
+            report.watermark = report_watermark(report.type)
+            previous = find_reusable_report(report.type, report.format, report.watermark)
+            if previous is not None:
+                report.file = previous.file
+            else:
+                build_report(report)
+    except Exception:
+        logger.exception('Report %s failed', report.id)
+        report.status = Status.FALIED
+        finish_report(report, ['status'])
+        return False
+
+    report.status = Status.COMPLETED
+    if not finish_report(report, ['status', 'file', 'watermark']):
+        logger.warning('Report %s was requeued while it was being built, dropping the result', report.id)
+        if previous is None and report.file:
+            report.file.delete(save=False)
+        return False
+    return True
+
+
+def process_next_report():
+    report = claim_report()
+    if report is None:
+        return None
+
+    process_report(report)
+    return report